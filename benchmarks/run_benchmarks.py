@@ -0,0 +1,178 @@
+"""
+Benchmarks the hot paths of playstyle_utils on seeded synthetic data (no Wyscout data needed)
+
+    python benchmarks/run_benchmarks.py --scale small                  # run and compare with the baseline
+    python benchmarks/run_benchmarks.py --scale small --save-baseline  # store the current numbers
+
+Time is the best wall time over --repeat runs; peak memory is measured by tracemalloc in a separate run
+(numba's own allocations are not visible to tracemalloc, numpy's are)
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from playstyle_utils.dtw import dtw_distance_numba, compute_dtw_distance_matrix
+from playstyle_utils.clustering import assign_to_nearest_medoids, split, compute_stability_metric
+from playstyle_utils.phases import SplitPossessionPhases
+from playstyle_utils.noise import RemoveNoise
+from synthetic import (synthetic_match_events, synthetic_trajectories, synthetic_match_trajectories,
+                       synthetic_cluster_assignments)
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+SCALES = {
+    "tiny": dict(dtw_pairs=2000, matrix_size=100, medoids=10, documents=20, chains=20, noise=2000, events=800, stability_docs=80),
+    "small": dict(dtw_pairs=20000, matrix_size=500, medoids=30, documents=100, chains=30, noise=20000, events=1600, stability_docs=380),
+    "medium": dict(dtw_pairs=100000, matrix_size=1500, medoids=70, documents=400, chains=60, noise=100000, events=3200, stability_docs=760),
+    "large": dict(dtw_pairs=500000, matrix_size=4000, medoids=70, documents=1500, chains=150, noise=400000, events=6400, stability_docs=3652),
+}
+
+
+def bench_dtw_distance(params):
+    trajs = synthetic_trajectories(params["dtw_pairs"] + 1, seed=1)
+    def run():
+        for a, b in zip(trajs[:-1], trajs[1:]):
+            dtw_distance_numba(a, b)
+    return run, params["dtw_pairs"]
+
+
+def bench_dtw_matrix(params):
+    trajs = synthetic_trajectories(params["matrix_size"], seed=2)
+    def run():
+        # Silence the progress prints of compute_dtw_distance_matrix
+        with contextlib.redirect_stdout(io.StringIO()):
+            compute_dtw_distance_matrix(trajs)
+    n = params["matrix_size"]
+    return run, n * (n - 1) // 2
+
+
+def bench_assign(params):
+    medoid_trajs = synthetic_trajectories(params["medoids"], seed=3)
+    medoid_indices = list(range(params["medoids"]))
+    chains = synthetic_match_trajectories(params["documents"], params["chains"], seed=4)
+    def run():
+        with contextlib.redirect_stderr(io.StringIO()):
+            assign_to_nearest_medoids(medoid_indices, medoid_trajs, chains)
+    return run, params["documents"] * params["chains"]
+
+
+def bench_remove_noise(params):
+    trajs = [traj.tolist() for traj in synthetic_trajectories(params["noise"], seed=5, normalised=False)]
+    def run():
+        RemoveNoise(list(trajs)).remove_noise()
+    return run, params["noise"]
+
+
+def bench_split_phases(params):
+    actions, team_name_mapping = synthetic_match_events(params["events"], seed=6)
+    def run():
+        SplitPossessionPhases().split_possession_phases(actions, team_name_mapping)
+    return run, params["events"]
+
+
+def bench_stability(params):
+    clusters = synthetic_cluster_assignments(params["stability_docs"], seed=7)
+    def run():
+        compute_stability_metric(split(clusters, seed=0))
+    return run, params["stability_docs"]
+
+
+BENCHMARKS = {
+    "dtw_distance_numba": bench_dtw_distance,
+    "compute_dtw_distance_matrix": bench_dtw_matrix,
+    "assign_to_nearest_medoids": bench_assign,
+    "RemoveNoise": bench_remove_noise,
+    "SplitPossessionPhases": bench_split_phases,
+    "compute_stability_metric": bench_stability,
+}
+
+
+def warm_up():
+    # Pay the numba JIT compilation outside of the measurements
+    a, b = synthetic_trajectories(2, seed=0)
+    dtw_distance_numba(a, b)
+
+
+def measure(run, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2**20}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Returns a message per stage whose time or peak memory exceeds the baseline by more than the threshold ratio
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or base["items"] != result["items"]:
+            continue
+        for metric in ["seconds", "peak_mb"]:
+            # Ignore noise on very small numbers
+            floor = 0.01 if metric == "seconds" else 0.1
+            if result[metric] > threshold * max(base[metric], floor):
+                regressions.append(f"{name}: {metric} {result[metric]:.4f} vs baseline {base[metric]:.4f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the playstyle_utils hot paths on synthetic data")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--only", nargs="*", choices=BENCHMARKS, help="run only these stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=1.25, help="regression ratio against the baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    params = SCALES[args.scale]
+    warm_up()
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        run, items = BENCHMARKS[name](params)
+        results[name] = {"items": items, **measure(run, args.repeat)}
+        r = results[name]
+        print(f"{name:<30} {r['items']:>9} items {r['seconds']:>9.4f} s {r['peak_mb']:>9.2f} MB")
+
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.save_baseline:
+        scale_results = stored.get(args.scale, {})
+        scale_results.update(results)
+        stored[args.scale] = scale_results
+        stored["machine"] = platform.platform()
+        args.baseline.write_text(json.dumps(stored, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if args.scale not in stored:
+        print(f"No {args.scale} baseline in {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, stored[args.scale], args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
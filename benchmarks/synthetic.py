@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+PITCH_LENGTH = 105
+PITCH_WIDTH = 68
+
+# Atomic-SPADL action types with rough relative frequencies inside a possession
+ON_BALL_TYPES = ["pass", "receival", "dribble", "cross", "take_on", "shot", "clearance", "tackle"]
+ON_BALL_WEIGHTS = [0.38, 0.36, 0.12, 0.03, 0.03, 0.02, 0.03, 0.03]
+BREAK_TYPES = ["out", "interception", "foul", "throw_in", "corner", "freekick", "goalkick", "offside", "keeper_save"]
+
+
+def synthetic_match_events(n_events: int = 1600, seed: int = 0, team_ids=(1, 2)) -> tuple[pd.DataFrame, dict[int, str]]:
+    """
+    Generates one match in the format of `EventToAtomic.complete_atomic_events`
+    Returns the actions and the team_name_mapping
+    """
+    rng = np.random.default_rng(seed)
+    team_name_mapping = {team_id: f"Team {team_id}" for team_id in team_ids}
+
+    # Possessions of geometric length that alternate between the two teams
+    team_idx = np.cumsum(rng.random(n_events) < 0.12) % len(team_ids)
+    team_id = np.asarray(team_ids)[team_idx]
+
+    types = rng.choice(ON_BALL_TYPES, size=n_events, p=ON_BALL_WEIGHTS).astype(object)
+    breaks = rng.random(n_events) < 0.06
+    types[breaks] = rng.choice(BREAK_TYPES, size=int(breaks.sum()))
+
+    # Mostly short gaps, occasionally a long stoppage
+    gaps = rng.exponential(2.0, n_events) + (rng.random(n_events) < 0.02) * rng.uniform(10, 40, n_events)
+    seconds = np.cumsum(gaps).astype(int)
+    nice_time = [f"{s // 60}m{s % 60}s" for s in seconds]
+
+    players = np.array([f"Player {t}-{p}" for t, p in zip(team_id, rng.integers(1, 12, n_events))], dtype=object)
+
+    # Ball positions follow a bounded random walk across the pitch
+    steps = rng.normal(0, [8, 6], size=(n_events, 2))
+    xy = np.empty((n_events + 1, 2))
+    xy[0] = [PITCH_LENGTH / 2, PITCH_WIDTH / 2]
+    for i in range(n_events):
+        xy[i + 1] = np.clip(xy[i] + steps[i], [0.5, 0.5], [PITCH_LENGTH - 0.5, PITCH_WIDTH - 0.5])
+
+    actions = pd.DataFrame({
+        "nice_time": nice_time,
+        "player": players,
+        "start_x": xy[:-1, 0],
+        "start_y": xy[:-1, 1],
+        "end_x": xy[1:, 0],
+        "end_y": xy[1:, 1],
+        "type": types,
+        "team": [team_name_mapping[t] for t in team_id],
+        "team_id": team_id,
+    })
+    return actions, team_name_mapping
+
+
+def synthetic_trajectories(n_trajectories: int = 1000, seed: int = 0, min_points: int = 5, max_points: int = 8,
+                           normalised: bool = True) -> list[np.ndarray]:
+    """
+    Generates movement chain trajectories on the 105x68 pitch, optionally normalised to [0, 1]
+    """
+    rng = np.random.default_rng(seed)
+    scale = np.array([PITCH_LENGTH, PITCH_WIDTH], dtype=float)
+    trajectories = []
+    for n_points in rng.integers(min_points, max_points + 1, n_trajectories):
+        start = rng.uniform([0, 0], scale)
+        # Forward-biased steps, so trajectories look like attacking moves
+        steps = rng.normal([6, 0], [10, 9], size=(n_points - 1, 2))
+        traj = np.clip(np.vstack([start, start + np.cumsum(steps, axis=0)]), 0.5, scale - 0.5)
+        trajectories.append(traj / scale if normalised else traj)
+    return trajectories
+
+
+def synthetic_match_trajectories(n_documents: int = 200, chains_per_document: int = 30, seed: int = 0,
+                                 n_teams: int = 20) -> dict[str, list[list[list[float]]]]:
+    """
+    Generates a `match_movement_chains_coords`-like dict: "gameid_team" -> list of normalised trajectories
+    """
+    rng = np.random.default_rng(seed)
+    trajectories = synthetic_trajectories(n_documents * chains_per_document, seed=seed)
+    out = {}
+    for doc in range(n_documents):
+        team = f"Team {rng.integers(n_teams)}"
+        chunk = trajectories[doc * chains_per_document:(doc + 1) * chains_per_document]
+        out[f"{1000 + doc}_{team}"] = [traj.tolist() for traj in chunk]
+    return out
+
+
+def synthetic_cluster_assignments(n_documents: int = 760, chains_per_document: int = 150, n_medoids: int = 70,
+                                  n_teams: int = 20, seed: int = 0) -> dict[str, list[int]]:
+    """
+    Generates a `movement_chain_clusters`-like dict with team-specific medoid preferences
+    """
+    rng = np.random.default_rng(seed)
+    medoid_ids = rng.choice(20000, size=n_medoids, replace=False)
+    team_profiles = rng.dirichlet(np.full(n_medoids, 0.5), size=n_teams)
+    out = {}
+    for doc in range(n_documents):
+        team = doc % n_teams
+        out[f"{1000 + doc // 2}_Team {team}"] = rng.choice(medoid_ids, size=chains_per_document, p=team_profiles[team]).tolist()
+    return out
@@ -1,33 +1,88 @@
-from .dtw import dtw_distance_numba, compute_dtw_distance_matrix
-from .clustering import assign_to_nearest_medoids, split, manhattan_dist, compute_stability_metric
-from .spadl_atomic import EventToAtomic
-from .phases import SplitPossessionPhases, FilterPhases, MakeMovementChains, split_sequences_on_time_gaps
-from .noise import RemoveNoise
-from .bezier_utils import Bezier
-from .compositional import aitchison_mean, total_variation_distance
-from .algorithm_utils import compute_club_topic_distributions, aitchison_similarity
-from .applications_utils import standardized, home_vs_away, split_matches, aitchison_mean, make_show_plot, plot_club_styles
+import importlib
 
-__all__ = [
-"dtw_distance_numba",
-"compute_dtw_distance_matrix",
-"assign_to_nearest_medoids",
-"split",
-"manhattan_dist",
-"compute_stability_metric",
-"EventToAtomic",
-"SplitPossessionPhases",
-"FilterPhases",
-"MakeMovementChains",
-"RemoveNoise",
-"Bezier",
-"aitchison_mean",
-"total_variation_distance",
-"standardized", 
-"compute_club_topic_distributions",
-"aitchison_similarity", 
-"home_vs_away", 
-"split_matches",
-"make_show_plot",
-"plot_club_styles",
-"split_sequences_on_time_gaps"]
\ No newline at end of file
+# Public name -> submodule defining it. Submodules (and their socceraction, shapely, numba,
+# tqdm and matplotlib imports) are only loaded when one of their names is first accessed
+_ATTRIBUTES = {
+"StageProfiler": "profiling",
+"profiled": "profiling",
+"dtw_distance_numba": "dtw",
+"compute_dtw_distance_matrix": "dtw",
+"as_compact": "dtw",
+"condensed_index": "dtw",
+"condensed_row": "dtw",
+"condensed_to_square": "dtw",
+"pack_trajectories": "dtw",
+"dtw_knn_graph": "knn_graph",
+"assign_to_nearest_medoids": "clustering",
+"nearest_medoids": "clustering",
+"weighted_kmedoids": "clustering",
+"deduplicate_trajectories": "dedup",
+"expand_distance_matrix": "dedup",
+"split": "clustering",
+"manhattan_dist": "clustering",
+"compute_stability_metric": "clustering",
+"embed_trajectories": "embedding",
+"embedding_distances": "embedding",
+"embedding_distance_matrix": "embedding",
+"assign_to_nearest_medoids_approx": "embedding",
+"label_agreement": "embedding",
+"EventToAtomic": "spadl_atomic",
+"SplitPossessionPhases": "phases",
+"FilterPhases": "phases",
+"MakeMovementChains": "phases",
+"split_sequences_on_time_gaps": "phases",
+"RemoveNoise": "noise",
+"SharedArrays": "shared_pool",
+"SharedWorkerPool": "shared_pool",
+"Bezier": "bezier_utils",
+"bernstein_matrix": "bezier_utils",
+"bezier_curves": "bezier_utils",
+"aitchison_mean": "compositional",
+"total_variation_distance": "compositional",
+"compute_club_topic_distributions": "algorithm_utils",
+"aitchison_similarity": "algorithm_utils",
+"LdaScorer": "lda_scorer",
+"bows_to_csr": "lda_scorer",
+"DocumentTermMatrix": "corpus",
+"build_document_term_matrix": "corpus",
+"compute_stability_metric_from_matrix": "corpus",
+"TopicStore": "topic_store",
+"team_league": "topic_store",
+"load_topic_distributions": "topic_store",
+"load_derived": "topic_store",
+"topic_distributions_from_model": "topic_store",
+"standardized": "applications_utils",
+"uniqueness_scores": "applications_utils",
+"consistency_scores": "applications_utils",
+"style_metrics": "applications_utils",
+"team_style_series": "applications_utils",
+"home_vs_away": "applications_utils",
+"split_matches": "applications_utils",
+"make_show_plot": "applications_utils",
+"plot_club_styles": "applications_utils",
+"draw_style_comparison": "applications_utils",
+"draw_club_styles": "applications_utils",
+"render_club_charts": "report",
+"StyleIndex": "similarity_index",
+"StyleService": "service",
+"bootstrap_clr_means": "bootstrap",
+"bootstrap_club_styles": "bootstrap",
+"bootstrap_home_vs_away": "bootstrap",
+"bootstrap_split_matches": "bootstrap",
+"ArtifactCache": "pipeline",
+"Pipeline": "pipeline",
+"content_hash": "pipeline"}
+
+__all__ = list(_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name not in _ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_ATTRIBUTES[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
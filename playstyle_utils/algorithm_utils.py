@@ -1,5 +1,6 @@
 import numpy as np
 import math
+from .profiling import profiled
 
 def clr(x, eps=1e-12):
     """
@@ -26,21 +27,32 @@ def aitchison_similarity(p, q):
     return math.exp(-d)
 
 
-def compute_club_topic_distributions(data_distr, dictionary, lda_model, num_topics):
+@profiled("topic_inference", items_in=lambda data_distr, *args, **kwargs: len(data_distr), items_out=len, drops=False)
+def compute_club_topic_distributions(data_distr, dictionary, lda_model, num_topics, scorer=None):
     """
     Computes and averages the topic distributions per club given the data and an LDA model
     Returns a dictionary mapping club names to their average topic distribution
+    scorer: an LdaScorer of the model scores all documents in one compiled batch instead of one by one
     """
     club_topic_vectors = {}
-    for key, doc in data_distr.items():
-        _, club = key.split('_', 1)
-        bow = dictionary.doc2bow(doc)
-        # Get topic distribution (ensure all topics are present)
-        doc_topics = lda_model.get_document_topics(bow, minimum_probability=0.0)
-        topic_vec = np.zeros(num_topics)
-        for topic_id, prob in doc_topics:
-            topic_vec[topic_id] = prob
-        club_topic_vectors.setdefault(club, []).append(topic_vec)
+    if scorer is not None:
+        from .lda_scorer import bows_to_csr
+
+        bows = [dictionary.doc2bow(doc) for doc in data_distr.values()]
+        theta = scorer.topic_distributions(bows_to_csr(bows, scorer.num_terms))
+        for key, topic_vec in zip(data_distr, theta):
+            _, club = key.split('_', 1)
+            club_topic_vectors.setdefault(club, []).append(topic_vec)
+    else:
+        for key, doc in data_distr.items():
+            _, club = key.split('_', 1)
+            bow = dictionary.doc2bow(doc)
+            # Get topic distribution (ensure all topics are present)
+            doc_topics = lda_model.get_document_topics(bow, minimum_probability=0.0)
+            topic_vec = np.zeros(num_topics)
+            for topic_id, prob in doc_topics:
+                topic_vec[topic_id] = prob
+            club_topic_vectors.setdefault(club, []).append(topic_vec)
     
     # Average topic distributions for each club
     club_avg_topic_distributions = {club: np.mean(vecs, axis=0)
@@ -1,5 +1,7 @@
 import numpy as np
-import matplotlib.pyplot as plt
+import pandas as pd
+from scipy.spatial.distance import pdist
+from .topic_store import TopicStore, team_league, clr_inverse
 
 def standardized(metric_score: list[list[str, float]], teams: list) ->list[list[str, float]]:
     scores = np.array([score for _, score in metric_score])
@@ -16,6 +18,59 @@ def standardized(metric_score: list[list[str, float]], teams: list) ->list[list[
     return standardized_team_score
 
 
+def uniqueness_scores(store: TopicStore, teams: list[str]) -> np.ndarray:
+    """
+    Uniqueness of each club: TV distance between its style and the Aitchison mean style of the other clubs
+    """
+    if len(teams) < 2:
+        raise ValueError(f"uniqueness needs at least 2 clubs to compare, got {len(teams)}")
+    club_clr = np.array([store.clr[store.team_rows(team)].mean(axis=0) for team in teams])
+    styles = clr_inverse(club_clr)
+
+    # Leave-one-out mean of the other clubs' styles, in CLR space
+    others_clr = (club_clr.sum(axis=0) - club_clr) / (len(teams) - 1)
+    others = clr_inverse(others_clr)
+    return 0.5 * np.abs(styles - others).sum(axis=1)
+
+
+def consistency_scores(store: TopicStore, teams: list[str]) -> np.ndarray:
+    """
+    Consistency of each club: 1 / (1 + mean pairwise TV distance between its matches)
+    """
+    scores = np.empty(len(teams))
+    for i, team in enumerate(teams):
+        mean_pairwise = 0.5 * pdist(store.topics[store.team_rows(team)], metric="cityblock").mean()
+        scores[i] = 1 / (1 + mean_pairwise)
+    return scores
+
+
+def style_metrics(store: TopicStore, leagues=None) -> pd.DataFrame:
+    """
+    Uniqueness and consistency for every club of the given league(s), with z-scores per league
+    Leagues without clubs are skipped; a league with a single club raises ValueError
+    """
+    if leagues is None:
+        leagues = sorted(set(store.team_leagues.values()) - {""})
+    elif isinstance(leagues, str):
+        leagues = [leagues]
+
+    frames = []
+    for league in leagues:
+        teams = store.league_teams(league)
+        if not teams:
+            continue
+        metrics = pd.DataFrame({"Club": teams, "League": league,
+                                "Uniqueness": uniqueness_scores(store, teams),
+                                "Consistency": consistency_scores(store, teams)})
+        for column in ["Uniqueness", "Consistency"]:
+            scores = metrics[column]
+            metrics[f"{column}_z"] = (scores - scores.mean()) / scores.std(ddof=1)
+        frames.append(metrics)
+    if not frames:
+        return pd.DataFrame(columns=["Club", "League", "Uniqueness", "Consistency", "Uniqueness_z", "Consistency_z"])
+    return pd.concat(frames, ignore_index=True)
+
+
 
 def aitchison_mean(list_of_lists):
     """
@@ -86,64 +141,79 @@ def split_matches(team, date, df_matches, topic_distributions_data):
     return style_summary
 
 
-def make_show_plot(df_matches, topic_distributions_data):
+def team_style_series(store: TopicStore, window=None, cutoffs=None, teams=None) -> pd.DataFrame:
+    """
+    Style trajectory of each team from prefix sums of its date-ordered CLR vectors
 
-    def show_plot(team: str, styles: dict, categories: list[str], date=None):
-        serie_a_teams = {"Lazio", "Internazionale", "Roma", "Sassuolo", "Cagliari", "Atalanta", "Chievo", "Benevento", "Bologna", "Udinese", "Crotone", "Napoli", "Milan", "Fiorentina", "Sampdoria", "SPAL", "Torino", "Genoa", "Juventus", "Hellas Verona"}
-        premier_league_teams = {"Burnley", "AFC Bournemouth", "Crystal Palace", "West Bromwich Albion", "Arsenal", "Huddersfield Town", "Brighton & Hove Albion", "Liverpool", "Watford", "Manchester United", "Newcastle United", "Chelsea", "Manchester City", "Southampton", "Swansea City", "Stoke City", "Leicester City", "Tottenham Hotspur", "Everton", "West Ham United"}
-        la_liga_teams = {"Barcelona", "Real Sociedad", "Atlético Madrid", "Eibar", "Espanyol", "Athletic Club", "Valencia", "Deportivo La Coruña", "Real Madrid", "Villarreal", "Deportivo Alavés", "Sevilla", "Getafe", "Málaga", "Las Palmas", "Girona", "Real Betis", "Leganés", "Celta de Vigo", "Levante"}
-        ligue1_teams = {"Caen", "PSG", "Dijon", "Angers", "Olympique Lyonnais", "Nice", "Olympique Marseille", "Amiens SC", "Bordeaux", "Metz", "Strasbourg", "Nantes", "Montpellier", "Rennes", "Saint-Étienne", "Lille", "Toulouse", "Guingamp", "Troyes", "Monaco"}
-        bundesliga_teams = {"Bayern München", "Stuttgart", "Hoffenheim", "Borussia Dortmund", "Hertha BSC", "RB Leipzig", "Freiburg", "Augsburg", "Schalke 04", "Eintracht Frankfurt", "Hannover 96", "Bayer Leverkusen", "Borussia M'gladbach", "Hamburger SV", "Werder Bremen", "Mainz 05", "Wolfsburg", "Köln"}
-
-        color_1 = "#515153C3"
-        color_2 = "#9d0208"
-
-        if team in serie_a_teams:
-            league = "Serie A"
-        elif team in ligue1_teams:
-            league = "Ligue 1"
-        elif team in premier_league_teams:
-            league = "Premier League"
-        elif team in la_liga_teams:
-            league = "La Liga"
-        elif team in bundesliga_teams:
-            league = "Bundesliga"
+    window: number of matches (int) or time span (e.g. "60D"); None means all earlier matches
+    cutoffs: dates to evaluate at, using matches strictly before each date as in `split_matches`;
+             without cutoffs the style is evaluated at every match, including that match
+    """
+    if teams is None:
+        teams = list(store.team_blocks)
+    if cutoffs is not None:
+        cutoffs = pd.to_datetime(list(cutoffs)).to_numpy(dtype="datetime64[ns]")
+    if window is not None and not isinstance(window, (int, np.integer)):
+        window = pd.Timedelta(window).to_timedelta64()
+
+    frames = []
+    for team in teams:
+        start, stop = store.team_blocks[team]
+        dates = store.dates[start:stop]
+        dated = int(np.count_nonzero(~np.isnat(dates)))
+        dates = dates[:dated]
+
+        if cutoffs is None:
+            points = dates
+            stops = np.arange(1, dated + 1)
         else:
-            league = ""
+            points = cutoffs
+            stops = np.searchsorted(dates, cutoffs, side="left")
+
+        if window is None:
+            starts = np.zeros_like(stops)
+        elif isinstance(window, (int, np.integer)):
+            starts = np.maximum(stops - window, 0)
+        elif cutoffs is None:
+            starts = np.searchsorted(dates, points - window, side="right")
+        else:
+            starts = np.searchsorted(dates, points - window, side="left")
 
-        x = np.arange(len(categories))
-        fig, ax = plt.subplots(figsize=(8, 5))
+        styles = store.window_styles(start + starts, start + stops)
+        frame = pd.DataFrame(styles, columns=[f"topic_{k}" for k in range(styles.shape[1])])
+        frame.insert(0, "n_matches", stops - starts)
+        frame.insert(0, "date", points)
+        frame.insert(0, "Club", team)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
 
-        if date is None:
-            home_styles = styles["home style"]
-            away_styles = styles["away style"]
-            ax.plot(x, home_styles, color=color_1, marker="o", linewidth=2, label="Home")
-            ax.plot(x, away_styles, color=color_2, marker="s", linestyle="--", linewidth=2, label="Away")
-        else:
-            pre_and_post_style = split_matches(team, date, df_matches, topic_distributions_data)
-            pre_style = pre_and_post_style[f"pre {date}"]
-            post_style = pre_and_post_style[f"post {date}"]
-            ax.plot(x, pre_style, color=color_1, marker="o", linewidth=2, label=f"pre {date}")
-            ax.plot(x, post_style, color=color_2, marker="s", linestyle="--", linewidth=2, label=f"post {date}")
-
-        ax.set_ylabel("Proportion")
-        ax.set_title(f"{team} - {league}")
-        ax.set_xticks(x)
-        ax.set_xticklabels(categories, rotation=45, ha="right")
-        ax.spines["top"].set_visible(False)
-        ax.spines["right"].set_visible(False)
-        ax.grid(True, which="major", axis="both", linestyle="--", linewidth=0.6, alpha=0.4)
-        ax.legend(frameon=False)
-        fig.tight_layout()
-        plt.show()
 
-    return show_plot
+def draw_style_comparison(ax, title: str, first_style, second_style, labels: tuple[str, str], categories: list[str]):
+    """
+    Draws two style distributions (home/away or pre/post) on an existing axes
+    """
+    color_1 = "#515153C3"
+    color_2 = "#9d0208"
 
+    x = np.arange(len(categories))
+    ax.plot(x, first_style, color=color_1, marker="o", linewidth=2, label=labels[0])
+    ax.plot(x, second_style, color=color_2, marker="s", linestyle="--", linewidth=2, label=labels[1])
 
-def plot_club_styles(club_style_distributions: dict, teams_to_plot: list[str],
-                     categories: list[str], title: str, figsize=(8, 5)):
+    ax.set_ylabel("Proportion")
+    ax.set_title(title)
+    ax.set_xticks(x)
+    ax.set_xticklabels(categories, rotation=45, ha="right")
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.grid(True, which="major", axis="both", linestyle="--", linewidth=0.6, alpha=0.4)
+    ax.legend(frameon=False)
+
+
+def draw_club_styles(ax, club_style_distributions: dict, teams_to_plot: list[str], categories: list[str], title: str):
+    """
+    Draws the style distributions of several clubs on an existing axes
+    """
     x = np.arange(len(categories))
-    fig, ax = plt.subplots(figsize=figsize)
 
     for team in teams_to_plot:
         if team not in club_style_distributions:
@@ -159,5 +229,36 @@ def plot_club_styles(club_style_distributions: dict, teams_to_plot: list[str],
     ax.spines["right"].set_visible(False)
     ax.grid(True, linestyle="--", alpha=0.6)
     ax.legend(frameon=False)
+
+
+def make_show_plot(df_matches, topic_distributions_data):
+    store = TopicStore.from_distributions(df_matches, topic_distributions_data)
+
+    def show_plot(team: str, styles: dict, categories: list[str], date=None):
+        import matplotlib.pyplot as plt
+
+        title = f"{team} - {team_league(team)}"
+        fig, ax = plt.subplots(figsize=(8, 5))
+
+        if date is None:
+            draw_style_comparison(ax, title, styles["home style"], styles["away style"], ("Home", "Away"), categories)
+        else:
+            pre_and_post_style = store.split_matches(team, date)
+            draw_style_comparison(ax, title, pre_and_post_style[f"pre {date}"], pre_and_post_style[f"post {date}"],
+                                  (f"pre {date}", f"post {date}"), categories)
+
+        fig.tight_layout()
+        plt.show()
+
+    return show_plot
+
+
+def plot_club_styles(club_style_distributions: dict, teams_to_plot: list[str],
+                     categories: list[str], title: str, figsize=(8, 5)):
+    # pyplot is only needed for interactive plots, so it is not imported with the module
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=figsize)
+    draw_club_styles(ax, club_style_distributions, teams_to_plot, categories, title)
     fig.tight_layout()
     plt.show()
\ No newline at end of file
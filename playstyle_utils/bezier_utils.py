@@ -1,4 +1,31 @@
 import numpy as np
+from math import comb
+
+def bernstein_matrix(degree: int, t_values) -> np.ndarray:
+    """
+    Returns the (len(t_values), degree + 1) matrix of Bernstein basis polynomials evaluated on t_values
+    """
+    t = np.asarray(t_values, dtype=float)[:, None]
+    k = np.arange(degree + 1)
+    coefficients = np.array([comb(degree, i) for i in k], dtype=float)
+    return coefficients * t ** k * (1 - t) ** (degree - k)
+
+def bezier_curves(control_polygons: list, t_values) -> np.ndarray:
+    """
+    Evaluates many Bezier curves on the same t grid at once
+    Returns an array of shape (n_curves, len(t_values), dim); polygons may have different numbers of points
+    """
+    polygons = [np.asarray(points, dtype=float) for points in control_polygons]
+    curves = np.empty((len(polygons), len(t_values), polygons[0].shape[1]))
+
+    # One Bernstein matrix per degree, shared by every polygon of that degree
+    by_degree = {}
+    for idx, points in enumerate(polygons):
+        by_degree.setdefault(len(points) - 1, []).append(idx)
+    for degree, idxs in by_degree.items():
+        basis = bernstein_matrix(degree, t_values)
+        curves[idxs] = np.einsum("tk,ckd->ctd", basis, np.stack([polygons[i] for i in idxs]))
+    return curves
 
 class Bezier():
     def TwoPoints(t: float, P1: np.ndarray, P2: np.ndarray) -> np.ndarray:
@@ -28,10 +55,7 @@ class Bezier():
 
     def Curve(t_values: list, points: list) -> np.ndarray:
         """
-        Returns a point interpolated by the Bezier process
+        Returns the points of the Bezier curve at every t in t_values
+        Evaluated in Bernstein form; gives the same points as applying Point to each t
         """
-        curve = np.array([[0.0] * len(points[0])])
-        for t in t_values:
-            curve = np.append(curve, [Bezier.Point(t, points)], axis=0)
-        curve = np.delete(curve, 0, 0)
-        return curve
\ No newline at end of file
+        return bezier_curves([points], t_values)[0]
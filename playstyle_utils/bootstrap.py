@@ -0,0 +1,123 @@
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .topic_store import TopicStore, clr_inverse
+
+
+def bootstrap_clr_means(clr: np.ndarray, groups: list[np.ndarray], n_boot: int = 1000, seed=None,
+                        n_jobs: int = 1, chunk: int = 100) -> np.ndarray:
+    """
+    Bootstrap means of the CLR rows of every group at once
+    Returns an (n_groups, n_boot, n_topics) array
+
+    Resample index matrices are drawn for all groups together, one chunk of bootstrap replicates at
+    a time; chunks get independent child seeds, so results do not depend on n_jobs
+    """
+    sizes = np.array([len(rows) for rows in groups], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    flat_rows = np.concatenate([np.asarray(rows, dtype=np.int64) for rows in groups]) if len(groups) else np.empty(0, np.int64)
+    max_size = int(sizes.max()) if len(sizes) else 0
+    valid = np.arange(max_size)[None, None, :] < sizes[:, None, None]
+
+    bounds = [(start, min(start + chunk, n_boot)) for start in range(0, n_boot, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    means = np.full((len(groups), n_boot, clr.shape[1]), np.nan)
+
+    def run(chunk_idx):
+        start, stop = bounds[chunk_idx]
+        rng = np.random.default_rng(seeds[chunk_idx])
+        # Uniform draws scaled to each group's size, so one matrix serves groups of any size
+        u = rng.random((len(groups), stop - start, max_size))
+        picks = offsets[:, None, None] + (u * sizes[:, None, None]).astype(np.int64)
+        picks = np.where(valid, picks, 0)
+        gathered = clr[flat_rows[picks]] if len(flat_rows) else np.zeros(picks.shape + (clr.shape[1],))
+        gathered[~np.broadcast_to(valid, picks.shape)] = 0.0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[:, start:stop] = gathered.sum(axis=2) / sizes[:, None, None]
+
+    if n_jobs == 1:
+        for chunk_idx in range(len(bounds)):
+            run(chunk_idx)
+    else:
+        # numpy releases the GIL in the gathers and reductions, so threads run the chunks in parallel
+        with ThreadPoolExecutor(n_jobs) as pool:
+            list(pool.map(run, range(len(bounds))))
+    return means
+
+
+def _interval(samples: np.ndarray, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    with warnings.catch_warnings():
+        # Groups without matches have all-NaN samples and get NaN bounds
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanquantile(samples, alpha / 2, axis=1), np.nanquantile(samples, 1 - alpha / 2, axis=1)
+
+
+def bootstrap_club_styles(store: TopicStore, teams=None, n_boot: int = 1000, alpha: float = 0.05, seed=None,
+                          n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Percentile bootstrap intervals of every club's Aitchison mean style, one row per club and topic
+    """
+    if teams is None:
+        teams = list(store.team_blocks)
+    groups = [np.arange(*store.team_blocks[team]) for team in teams]
+    styles = clr_inverse(bootstrap_clr_means(store.clr, groups, n_boot, seed, n_jobs))
+    lower, upper = _interval(styles, alpha)
+    estimate = np.array([store.style(rows) for rows in groups])
+    return _long_frame(teams, {"style": estimate, "lower": lower, "upper": upper})
+
+
+def _compare(store: TopicStore, teams, first_groups, second_groups, labels, n_boot, alpha, seed, n_jobs) -> pd.DataFrame:
+    n = len(teams)
+    means = bootstrap_clr_means(store.clr, first_groups + second_groups, n_boot, seed, n_jobs)
+    first, second = clr_inverse(means[:n]), clr_inverse(means[n:])
+    lower, upper = _interval(first - second, alpha)
+
+    first_style = np.array([store.style(rows) if len(rows) else np.full(store.clr.shape[1], np.nan) for rows in first_groups])
+    second_style = np.array([store.style(rows) if len(rows) else np.full(store.clr.shape[1], np.nan) for rows in second_groups])
+    frame = _long_frame(teams, {labels[0]: first_style, labels[1]: second_style, "difference": first_style - second_style,
+                                "lower": lower, "upper": upper})
+    # The difference is significant at level alpha when its interval excludes 0
+    frame["significant"] = (frame["lower"] > 0) | (frame["upper"] < 0)
+    return frame
+
+
+def bootstrap_home_vs_away(store: TopicStore, teams=None, n_boot: int = 1000, alpha: float = 0.05, seed=None,
+                           n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Bootstrap intervals of the home minus away style difference of every club, per topic
+    """
+    if teams is None:
+        teams = list(store.team_blocks)
+    home, away = [], []
+    for team in teams:
+        start, stop = store.team_blocks[team]
+        venues = store.venues[start:stop]
+        home.append(start + np.flatnonzero(venues == "home"))
+        away.append(start + np.flatnonzero(venues == "away"))
+    return _compare(store, teams, home, away, ("home", "away"), n_boot, alpha, seed, n_jobs)
+
+
+def bootstrap_split_matches(store: TopicStore, date, teams=None, n_boot: int = 1000, alpha: float = 0.05, seed=None,
+                            n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Bootstrap intervals of the pre minus post date style difference of every club, per topic
+    """
+    if teams is None:
+        teams = list(store.team_blocks)
+    pre, post = [], []
+    for team in teams:
+        pre_rows, post_rows = store.date_rows(team, date)
+        pre.append(np.arange(pre_rows.start, pre_rows.stop))
+        post.append(np.arange(post_rows.start, post_rows.stop))
+    return _compare(store, teams, pre, post, ("pre", "post"), n_boot, alpha, seed, n_jobs)
+
+
+def _long_frame(teams: list[str], columns: dict[str, np.ndarray]) -> pd.DataFrame:
+    n_topics = next(iter(columns.values())).shape[1]
+    frame = pd.DataFrame({"Club": np.repeat(teams, n_topics), "topic": np.tile(np.arange(n_topics), len(teams))})
+    for name, values in columns.items():
+        frame[name] = np.asarray(values).reshape(-1)
+    return frame
@@ -1,37 +1,163 @@
 import numpy as np
 from numba import njit
 from tqdm import tqdm
+from .dedup import deduplicate_trajectories
 from .dtw import dtw_distance_numba 
+from .profiling import profiled
 import random
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, namedtuple
 
-def assign_to_nearest_medoids(medoid_indices: list[int], medoid_trajs: list[np.ndarray], all_movement_chain_coordinates: dict[str, list[list[list[float]]]]) -> dict[str, list[int]]:
+@profiled("assignment", items_in=lambda medoid_indices, medoid_trajs, all_movement_chain_coordinates, *args, **kwargs: sum(len(trajs) for trajs in all_movement_chain_coordinates.values()),
+          items_out=lambda assignments: sum(len(labels) for labels in assignments.values()))
+def assign_to_nearest_medoids(medoid_indices: list[int], medoid_trajs: list[np.ndarray], all_movement_chain_coordinates: dict[str, list[list[list[float]]]], dtype=None, pool=None, deduplicate: bool = False, decimals: int = None) -> dict[str, list[int]]:
     """
     Assign each trajectory to nearest medoid
+    dtype=np.float32 stores the trajectories in float32 (see compute_dtw_distance_matrix for the accuracy bound);
+    None means np.double, or the pool's dtype when a pool is given
+    pool: a SharedWorkerPool built over all_movement_chain_coordinates runs the assignment in its workers
+    (it holds the trajectories in the dtype it was built with and does not deduplicate)
+    deduplicate=True computes DTW once per distinct trajectory (same result, see deduplicate_trajectories);
+    decimals also merges trajectories equal after rounding, which then share their first occurrence's label
     """
-    assignments = {}
+    if decimals is not None and not deduplicate:
+        raise ValueError("decimals requires deduplicate=True")
+    if pool is not None:
+        if pool.n_trajectories != sum(len(traj_list) for traj_list in all_movement_chain_coordinates.values()):
+            raise ValueError("pool was built over different trajectories")
+        if dtype is not None and np.dtype(dtype) != pool.dtype:
+            raise ValueError(f"pool holds {pool.dtype} trajectories, got dtype={np.dtype(dtype)}")
+        if deduplicate:
+            raise ValueError("deduplicate is not supported with a pool")
+        return pool.assign_to_nearest_medoids(medoid_indices, medoid_trajs)
+
+    dtype = np.double if dtype is None else dtype
+    medoid_trajs = [np.asarray(traj, dtype=dtype) for traj in medoid_trajs]
+
+    if deduplicate:
+        # DTW runs once per distinct trajectory; copies share its label
+        keys = list(all_movement_chain_coordinates)
+        unique, _, inverse = deduplicate_trajectories([traj for key in keys for traj in all_movement_chain_coordinates[key]],
+                                                   decimals)
+        best = nearest_medoids(tqdm(unique, desc="Assigning unique trajectories"), medoid_trajs, dtype)
+        assignments = {}
+        start = 0
+        for key in keys:
+            stop = start + len(all_movement_chain_coordinates[key])
+            assignments[key] = [medoid_indices[best[u]] for u in inverse[start:stop]]
+            start = stop
+        return assignments
 
+    assignments = {}
     for club_id, traj_list in tqdm(all_movement_chain_coordinates.items(), desc="Assigning trajectories"):
-        club_assignments = []
+        # Assign to actual medoid index
+        assignments[club_id] = [medoid_indices[best_idx] for best_idx in nearest_medoids(traj_list, medoid_trajs, dtype)]
 
-        for traj in traj_list:
-            traj_np = np.array(traj, dtype=np.double)
+    return assignments
 
-            # Find closest medoid (based on DTW)
-            best_idx = 0
-            best_dist = float("inf")
-            for i in range(len(medoid_trajs)):
-                dist = dtw_distance_numba(traj_np, medoid_trajs[i])
-                if dist < best_dist:
-                    best_dist = dist
-                    best_idx = i
+def nearest_medoids(traj_list: list, medoid_trajs: list[np.ndarray], dtype=np.double) -> list[int]:
+    """
+    Position in medoid_trajs of the closest medoid (based on DTW) of every trajectory
+    """
+    best = []
+    for traj in traj_list:
+        traj_np = np.array(traj, dtype=dtype)
 
-            # Assign to actual medoid index
-            club_assignments.append(medoid_indices[best_idx])
+        best_idx = 0
+        best_dist = float("inf")
+        for i in range(len(medoid_trajs)):
+            dist = dtw_distance_numba(traj_np, medoid_trajs[i])
+            if dist < best_dist:
+                best_dist = dist
+                best_idx = i
+        best.append(best_idx)
+    return best
 
-        assignments[club_id] = club_assignments
+WeightedKMedoidsResult = namedtuple("WeightedKMedoidsResult", ["medoids", "labels", "loss", "n_iter"])
 
-    return assignments
+@njit(cache=True)
+def _nearest_two(distances: np.ndarray, medoids: np.ndarray):
+    n = distances.shape[0]
+    nearest = np.zeros(n, dtype=np.int64)
+    d_nearest = np.full(n, np.inf)
+    d_second = np.full(n, np.inf)
+    for o in range(n):
+        for m in range(len(medoids)):
+            d = distances[o, medoids[m]]
+            if d < d_nearest[o]:
+                d_second[o] = d_nearest[o]
+                d_nearest[o] = d
+                nearest[o] = m
+            elif d < d_second[o]:
+                d_second[o] = d
+    return nearest, d_nearest, d_second
+
+@njit(cache=True)
+def _weighted_build(distances: np.ndarray, weights: np.ndarray, n_clusters: int) -> np.ndarray:
+    n = distances.shape[0]
+    medoids = np.empty(n_clusters, dtype=np.int64)
+    is_medoid = np.zeros(n, dtype=np.bool_)
+    d_nearest = np.full(n, np.inf)
+    for c in range(n_clusters):
+        best_x, best_cost = -1, np.inf
+        for x in range(n):
+            if is_medoid[x]:
+                continue
+            cost = 0.0
+            for o in range(n):
+                cost += weights[o] * min(d_nearest[o], distances[o, x])
+            if cost < best_cost:
+                best_x, best_cost = x, cost
+        medoids[c] = best_x
+        is_medoid[best_x] = True
+        for o in range(n):
+            d_nearest[o] = min(d_nearest[o], distances[o, best_x])
+    return medoids
+
+@njit(cache=True)
+def _weighted_swap(distances: np.ndarray, weights: np.ndarray, medoids: np.ndarray, max_iter: int) -> int:
+    n, k = distances.shape[0], len(medoids)
+    for it in range(max_iter):
+        nearest, d_nearest, d_second = _nearest_two(distances, medoids)
+        is_medoid = np.zeros(n, dtype=np.bool_)
+        is_medoid[medoids] = True
+        loss = (weights * d_nearest).sum()
+
+        # FastPAM1: the change of every swap (m, x) for one x in a single pass over the points
+        best_delta, best_m, best_x = -1e-12 * (loss + 1.0), -1, -1
+        delta = np.empty(k)
+        for x in range(n):
+            if is_medoid[x]:
+                continue
+            delta[:] = 0.0
+            shared = 0.0
+            for o in range(n):
+                d = distances[o, x]
+                gain = min(0.0, d - d_nearest[o])
+                shared += weights[o] * gain
+                delta[nearest[o]] += weights[o] * (min(d_second[o], d) - d_nearest[o] - gain)
+            for m in range(k):
+                if shared + delta[m] < best_delta:
+                    best_delta, best_m, best_x = shared + delta[m], m, x
+        if best_m < 0:
+            return it
+        medoids[best_m] = best_x
+    return max_iter
+
+def weighted_kmedoids(distances: np.ndarray, weights: np.ndarray, n_clusters: int, max_iter: int = 100) -> WeightedKMedoidsResult:
+    """
+    k-medoids (BUILD + FastPAM1 swaps) minimising sum_i weights[i] * distance to the nearest medoid
+
+    With the unique trajectories and counts of deduplicate_trajectories this clusters as if every copy were
+    present, on a matrix of the unique trajectories only; labels index into medoids, like kmedoids' results
+    """
+    distances = np.ascontiguousarray(distances, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if not 1 <= n_clusters <= len(distances):
+        raise ValueError(f"n_clusters must be between 1 and {len(distances)}, got {n_clusters}")
+    medoids = _weighted_build(distances, weights, n_clusters)
+    n_iter = _weighted_swap(distances, weights, medoids, max_iter)
+    labels, d_nearest, _ = _nearest_two(distances, medoids)
+    return WeightedKMedoidsResult(medoids, labels, float((weights * d_nearest).sum()), n_iter)
 
 def split(movement_chain_clusters: dict[str, list[int]], seed=None) -> dict[str, tuple[Counter, Counter]]:
     if seed is not None:
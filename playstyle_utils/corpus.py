@@ -0,0 +1,183 @@
+import random
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial.distance import cdist
+
+
+class DocumentTermMatrix:
+    """
+    Sparse (documents x medoids) count matrix built from movement chain cluster assignments
+
+    Row i holds the medoid counts of the document `f"{game_ids[i]}_{teams[i]}"`,
+    column j counts the medoid id `vocabulary[j]`
+    """
+
+    def __init__(self, counts: csr_matrix, game_ids: np.ndarray, teams: np.ndarray, vocabulary: np.ndarray):
+        self.counts = counts
+        self.game_ids = game_ids
+        self.teams = teams
+        self.vocabulary = vocabulary
+        self._index = None
+
+    @classmethod
+    def from_clusters(cls, movement_chain_clusters: dict[str, list[int]], vocabulary=None) -> "DocumentTermMatrix":
+        """
+        Builds the matrix directly from the integer medoid ids, without string tokens or Counters
+        """
+        keys = list(movement_chain_clusters.keys())
+        lengths = np.fromiter((len(doc) for doc in movement_chain_clusters.values()), dtype=np.int64, count=len(keys))
+        tokens = np.fromiter(chain.from_iterable(movement_chain_clusters.values()), dtype=np.int64, count=int(lengths.sum()))
+
+        if vocabulary is None:
+            vocabulary, cols = np.unique(tokens, return_inverse=True)
+        else:
+            vocabulary = np.asarray(vocabulary, dtype=np.int64)
+            order = np.argsort(vocabulary, kind="stable")
+            pos = np.searchsorted(vocabulary, tokens, sorter=order)
+            pos = np.minimum(pos, len(vocabulary) - 1)
+            cols = order[pos]
+            if not np.array_equal(vocabulary[cols], tokens):
+                raise ValueError("movement_chain_clusters contains medoid ids missing from the vocabulary")
+
+        rows = np.repeat(np.arange(len(keys)), lengths)
+        counts = csr_matrix((np.ones(len(tokens), dtype=np.int64), (rows, cols)), shape=(len(keys), len(vocabulary)))
+        counts.sum_duplicates()
+
+        game_ids = np.empty(len(keys), dtype=np.int64)
+        teams = np.empty(len(keys), dtype=object)
+        for i, key in enumerate(keys):
+            match_id, team = key.split("_", 1)
+            game_ids[i] = int(match_id)
+            teams[i] = team
+
+        return cls(counts, game_ids, teams, vocabulary)
+
+    @property
+    def keys(self) -> list[str]:
+        return [f"{game_id}_{team}" for game_id, team in zip(self.game_ids, self.teams)]
+
+    def row(self, game_id: int, team: str) -> int:
+        """
+        Returns the row index of the document of a team in a given match
+        """
+        if self._index is None:
+            self._index = {(int(g), t): i for i, (g, t) in enumerate(zip(self.game_ids, self.teams))}
+        return self._index[(int(game_id), team)]
+
+    def id2word(self) -> dict[int, str]:
+        """
+        Column id -> token mapping, in the string form the notebooks use for gensim
+        """
+        return {j: str(token) for j, token in enumerate(self.vocabulary)}
+
+    def to_gensim_corpus(self, dictionary=None):
+        """
+        Wraps the matrix as a gensim streamed corpus of (token_id, count) documents
+
+        Without a dictionary the column ids are the token ids (see `id2word`) and the
+        CSR buffers are shared as is. With a gensim `Dictionary` (e.g. the one an existing
+        LDA model was trained with) only the column indices are remapped to its token ids
+        """
+        from gensim.matutils import Sparse2Corpus
+
+        return Sparse2Corpus(self.model_counts(dictionary), documents_columns=False)
+
+    def model_counts(self, dictionary=None) -> csr_matrix:
+        """
+        The count matrix with columns in a model's token id order: the columns as they are without
+        a dictionary, remapped to `dictionary.token2id` with one (e.g. the LDA model's gensim Dictionary)
+        """
+        counts = self.counts
+        if dictionary is not None:
+            remap = np.array([dictionary.token2id[str(token)] for token in self.vocabulary], dtype=counts.indices.dtype)
+            counts = csr_matrix((counts.data, remap[counts.indices], counts.indptr), shape=(counts.shape[0], len(dictionary)))
+        return counts
+
+    def topic_distributions(self, lda_model, num_topics: int, dictionary=None) -> np.ndarray:
+        """
+        Returns the (documents x topics) matrix of LDA topic distributions
+        """
+        theta = np.zeros((self.counts.shape[0], num_topics))
+        doc_topics = lda_model.get_document_topics(self.to_gensim_corpus(dictionary), minimum_probability=0.0)
+        for i, topics in enumerate(doc_topics):
+            for topic_id, prob in topics:
+                theta[i, topic_id] = prob
+        return theta
+
+    def club_topic_distributions(self, lda_model, num_topics: int, dictionary=None) -> dict[str, np.ndarray]:
+        """
+        Matrix counterpart of `compute_club_topic_distributions`: the average topic distribution per club
+        """
+        theta = self.topic_distributions(lda_model, num_topics, dictionary)
+        clubs, club_rows = np.unique(self.teams.astype(str), return_inverse=True)
+        sums = np.zeros((len(clubs), num_topics))
+        np.add.at(sums, club_rows, theta)
+        sums /= np.bincount(club_rows)[:, None]
+        return {club: sums[c] for c, club in enumerate(clubs)}
+
+    def split(self, seed=None) -> tuple[list[str], csr_matrix, csr_matrix]:
+        """
+        Matrix counterpart of `split`: shuffles each club's matches into two halves
+        and returns the clubs with their (clubs x medoids) counts for the A and B halves
+
+        The shuffle consumes `random` exactly like `split`, so the same seed gives the same halves
+        """
+        if seed is not None:
+            random.seed(seed)
+
+        club_rows = defaultdict(list)
+        for i, team in enumerate(self.teams):
+            club_rows[team].append(i)
+
+        clubs = list(club_rows)
+        a_rows, a_clubs, b_rows, b_clubs = [], [], [], []
+        for c, rows in enumerate(club_rows.values()):
+            random.shuffle(rows)
+            half = len(rows) // 2
+            a_rows.extend(rows[:half])
+            a_clubs.extend([c] * half)
+            b_rows.extend(rows[half:])
+            b_clubs.extend([c] * (len(rows) - half))
+
+        shape = (len(clubs), self.counts.shape[0])
+        select_a = csr_matrix((np.ones(len(a_rows)), (a_clubs, a_rows)), shape=shape)
+        select_b = csr_matrix((np.ones(len(b_rows)), (b_clubs, b_rows)), shape=shape)
+        return clubs, select_a @ self.counts, select_b @ self.counts
+
+
+def build_document_term_matrix(movement_chain_clusters: dict[str, list[int]], vocabulary=None) -> DocumentTermMatrix:
+    """
+    Builds a sparse (documents x medoids) count matrix from `assign_to_nearest_medoids` output
+    """
+    return DocumentTermMatrix.from_clusters(movement_chain_clusters, vocabulary)
+
+
+def compute_stability_metric_from_matrix(dtm: DocumentTermMatrix, seed=None, normalize=True) -> tuple[float, float]:
+    """
+    Vectorised `compute_stability_metric(split(movement_chain_clusters, seed))` on a DocumentTermMatrix
+    """
+    clubs, counts_a, counts_b = dtm.split(seed)
+    n_teams = len(clubs)
+    if n_teams == 0:
+        return 0.0, 0.0
+
+    # Rows ordered team1_A, team1_B, team2_A, ... as in compute_stability_metric
+    vectors = np.empty((2 * n_teams, counts_a.shape[1]))
+    vectors[0::2] = counts_a.toarray()
+    vectors[1::2] = counts_b.toarray()
+    if normalize:
+        totals = vectors.sum(axis=1, keepdims=True)
+        np.divide(vectors, totals, out=vectors, where=totals > 0)
+
+    distances = cdist(vectors[0::2], vectors, metric="cityblock")
+    teams = np.arange(n_teams)
+    distances[teams, 2 * teams] = np.inf
+
+    ranking = np.argsort(distances, axis=1, kind="stable")[:, :3]
+    own_b = (2 * teams + 1)[:, None]
+    correct_matches = int((ranking[:, 0] == own_b[:, 0]).sum())
+    correct_matches2 = int((ranking == own_b).any(axis=1).sum())
+    return correct_matches / n_teams, correct_matches2 / n_teams
@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def deduplicate_trajectories(traj_list: list, decimals: int = None) -> tuple[list[np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Collapses identical trajectories into unique representatives
+    Returns (unique, counts, inverse): unique[inverse[i]] stands for traj_list[i] and counts[u] is
+    the number of trajectories unique[u] stands for
+
+    decimals rounds the coordinates before comparing, so near-identical trajectories collapse too
+    (the representative is the first occurrence, unrounded); None compares exact coordinates
+    """
+    first_of = {}
+    unique, counts, inverse = [], [], np.empty(len(traj_list), dtype=np.int64)
+    for i, traj in enumerate(traj_list):
+        traj = np.asarray(traj, dtype=np.float64)
+        # + 0.0 folds -0.0 into 0.0
+        key_coords = (traj if decimals is None else np.round(traj, decimals)) + 0.0
+        key = (traj.shape, key_coords.tobytes())
+        u = first_of.get(key)
+        if u is None:
+            u = first_of[key] = len(unique)
+            unique.append(traj)
+            counts.append(0)
+        counts[u] += 1
+        inverse[i] = u
+    return unique, np.array(counts, dtype=np.int64), inverse
+
+
+def expand_distance_matrix(distances: np.ndarray, inverse: np.ndarray) -> np.ndarray:
+    """
+    Distance matrix between all original trajectories from the matrix between their unique representatives
+    """
+    return distances[np.ix_(inverse, inverse)]
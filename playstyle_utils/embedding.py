@@ -0,0 +1,114 @@
+import numpy as np
+from .dtw import dtw_distance_numba
+from .profiling import profiled
+
+
+def embed_trajectories(traj_list: list, n_points: int = 16, dtype=np.float32) -> np.ndarray:
+    """
+    Resamples every trajectory to n_points equally spaced along its arc length
+    Returns an (n_trajectories, 2 * n_points) array of [x0, y0, x1, y1, ...] rows
+    """
+    trajs = [np.asarray(traj, dtype=np.float64) for traj in traj_list]
+    embedding = np.empty((len(trajs), n_points, 2), dtype=dtype)
+    fractions = np.linspace(0.0, 1.0, n_points)
+
+    # Trajectories of equal length are resampled together
+    by_length = {}
+    for idx, traj in enumerate(trajs):
+        by_length.setdefault(len(traj), []).append(idx)
+
+    for length, idxs in by_length.items():
+        points = np.stack([trajs[i] for i in idxs])
+        if length == 1:
+            embedding[idxs] = points
+            continue
+        seg_lengths = np.sqrt((np.diff(points, axis=1) ** 2).sum(axis=2))
+        arc = np.concatenate([np.zeros((len(idxs), 1)), np.cumsum(seg_lengths, axis=1)], axis=1)
+        targets = fractions[None, :] * arc[:, -1:]
+
+        # Segment containing each target point, and the position inside it
+        seg = (arc[:, None, 1:-1] <= targets[:, :, None]).sum(axis=2)
+        rows = np.arange(len(idxs))[:, None]
+        seg_start = arc[rows, seg]
+        seg_len = seg_lengths[rows, seg]
+        w = np.divide(targets - seg_start, seg_len, out=np.zeros_like(targets), where=seg_len > 0)
+        w = np.clip(w, 0.0, 1.0)[:, :, None]
+        embedding[idxs] = (1 - w) * points[rows, seg] + w * points[rows, seg + 1]
+
+    return embedding.reshape(len(trajs), 2 * n_points)
+
+
+def embedding_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Euclidean distances between the rows of two embeddings
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    squared = (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None, :] - 2 * a @ b.T
+    return np.sqrt(np.maximum(squared, 0.0))
+
+
+def embedding_distance_matrix(traj_list: list, n_points: int = 16, dtype=np.float32, chunk: int = 1024) -> np.ndarray:
+    """
+    Approximate stand-in for compute_dtw_distance_matrix, e.g. to explore kmedoids clusterings cheaply
+
+    Rows are computed `chunk` at a time in float64 and stored straight into the dtype matrix,
+    so the only n x n buffer is the result
+    """
+    embedding = embed_trajectories(traj_list, n_points)
+    n = len(embedding)
+    distances = np.empty((n, n), dtype=dtype)
+    for start in range(0, n, chunk):
+        distances[start:start + chunk] = embedding_distances(embedding[start:start + chunk], embedding)
+    np.fill_diagonal(distances, 0)
+    return distances
+
+
+@profiled("assignment", items_in=lambda medoid_indices, medoid_trajs, all_movement_chain_coordinates, *args, **kwargs: sum(len(trajs) for trajs in all_movement_chain_coordinates.values()),
+          items_out=lambda assignments: sum(len(labels) for labels in assignments.values()))
+def assign_to_nearest_medoids_approx(medoid_indices: list[int], medoid_trajs: list[np.ndarray],
+                                     all_movement_chain_coordinates: dict[str, list[list[list[float]]]],
+                                     n_points: int = 16, refine: int = 0) -> dict[str, list[int]]:
+    """
+    Approximate `assign_to_nearest_medoids` on fixed-length arc-length embeddings
+
+    refine > 0 re-ranks the `refine` nearest medoids of each trajectory in embedding space with exact DTW
+    """
+    keys = list(all_movement_chain_coordinates)
+    trajs = [traj for key in keys for traj in all_movement_chain_coordinates[key]]
+    distances = embedding_distances(embed_trajectories(trajs, n_points), embed_trajectories(medoid_trajs, n_points))
+
+    if refine <= 0:
+        best = distances.argmin(axis=1)
+    else:
+        refine = min(refine, len(medoid_trajs))
+        candidates = np.argsort(distances, axis=1, kind="stable")[:, :refine]
+        # Exact DTW picks the first minimum in medoid order, like assign_to_nearest_medoids
+        candidates.sort(axis=1)
+        medoid_arrays = [np.asarray(traj, dtype=np.double) for traj in medoid_trajs]
+        best = np.empty(len(trajs), dtype=np.int64)
+        for t, traj in enumerate(trajs):
+            traj_np = np.asarray(traj, dtype=np.double)
+            dtw = [dtw_distance_numba(traj_np, medoid_arrays[m]) for m in candidates[t]]
+            best[t] = candidates[t][int(np.argmin(dtw))]
+
+    labels = np.asarray(medoid_indices)[best].tolist()
+    assignments = {}
+    start = 0
+    for key in keys:
+        stop = start + len(all_movement_chain_coordinates[key])
+        assignments[key] = labels[start:stop]
+        start = stop
+    return assignments
+
+
+def label_agreement(assignments: dict[str, list[int]], reference: dict[str, list[int]]) -> float:
+    """
+    Fraction of trajectories given the same medoid in both assignments (e.g. approximate vs exact DTW)
+    """
+    same = total = 0
+    for key, labels in reference.items():
+        other = assignments[key]
+        same += sum(a == b for a, b in zip(other, labels))
+        total += len(labels)
+    return same / total if total else 1.0
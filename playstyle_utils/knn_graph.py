@@ -0,0 +1,163 @@
+from itertools import chain
+
+import numpy as np
+from numba import njit, prange
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+
+from .dtw import pack_trajectories
+from .profiling import profiled
+
+
+@njit(cache=True)
+def _point_distance(x0, y0, x1, y1) -> float:
+    dx = np.float64(x0) - np.float64(x1)
+    dy = np.float64(y0) - np.float64(y1)
+    return (dx * dx + dy * dy) ** 0.5
+
+
+@njit(cache=True)
+def _box_distance(x, y, box) -> float:
+    dx = max(box[0] - x, 0.0, x - box[2])
+    dy = max(box[1] - y, 0.0, y - box[3])
+    return (dx * dx + dy * dy) ** 0.5
+
+
+@njit(cache=True)
+def _lb_kim(coords, offsets, i, j) -> float:
+    """
+    LB_Kim: every warping path contains the first and the last cell
+    """
+    a_start, a_stop = offsets[i], offsets[i + 1]
+    b_start, b_stop = offsets[j], offsets[j + 1]
+    kim = _point_distance(coords[a_start, 0], coords[a_start, 1], coords[b_start, 0], coords[b_start, 1])
+    if a_stop - a_start > 1 or b_stop - b_start > 1:
+        kim += _point_distance(coords[a_stop - 1, 0], coords[a_stop - 1, 1], coords[b_stop - 1, 0], coords[b_stop - 1, 1])
+    return kim
+
+
+@njit(cache=True)
+def _lb_box(coords, offsets, boxes, i, j) -> float:
+    """
+    Every point of one trajectory is matched to at least one point inside the other's bounding box
+    """
+    box_a = 0.0
+    for p in range(offsets[i], offsets[i + 1]):
+        box_a += _box_distance(np.float64(coords[p, 0]), np.float64(coords[p, 1]), boxes[j])
+    box_b = 0.0
+    for q in range(offsets[j], offsets[j + 1]):
+        box_b += _box_distance(np.float64(coords[q, 0]), np.float64(coords[q, 1]), boxes[i])
+    return max(box_a, box_b)
+
+
+@njit(cache=True)
+def _dtw_abandoning(coords, a_start, a_stop, b_start, b_stop, cutoff) -> float:
+    """
+    dtw_distance_numba on packed coordinates, returning inf as soon as a whole row of the
+    cumulative matrix exceeds cutoff (costs are non-negative, so the distance would too)
+    """
+    m = b_stop - b_start
+    prev = np.full(m + 1, np.inf)
+    prev[0] = 0.0
+    cur = np.empty(m + 1)
+    for i in range(a_start, a_stop):
+        cur[0] = np.inf
+        row_min = np.inf
+        for jj in range(1, m + 1):
+            j = b_start + jj - 1
+            cost = _point_distance(coords[i, 0], coords[i, 1], coords[j, 0], coords[j, 1])
+            value = cost + min(prev[jj], cur[jj - 1], prev[jj - 1])
+            cur[jj] = value
+            if value < row_min:
+                row_min = value
+        if row_min > cutoff:
+            return np.inf
+        prev, cur = cur, prev
+    return prev[m]
+
+
+@njit(parallel=True, cache=True)
+def _top_k(coords, offsets, boxes, rows, cand_ptr, cand_idx, k, upper):
+    """
+    Exact k nearest candidates of every row, given an upper bound on its k-th distance
+
+    Candidates whose LB_Kim exceeds the bound are dropped, the rest are visited by increasing
+    lower bound until the bound exceeds the current k-th distance; ties go to the smaller index
+    """
+    n_rows = len(rows)
+    out_idx = np.full((n_rows, k), -1, dtype=np.int64)
+    out_dist = np.full((n_rows, k), np.inf)
+    for r in prange(n_rows):
+        i = rows[r]
+        cands = cand_idx[cand_ptr[r]:cand_ptr[r + 1]]
+        bounds = np.full(len(cands), np.inf)
+        for c in range(len(cands)):
+            j = cands[c]
+            if j != i:
+                kim = _lb_kim(coords, offsets, i, j)
+                if kim <= upper[r]:
+                    bounds[c] = max(kim, _lb_box(coords, offsets, boxes, i, j))
+
+        best_d = out_dist[r]
+        best_j = out_idx[r]
+        for c in np.argsort(bounds):
+            j = cands[c]
+            if bounds[c] == np.inf or bounds[c] > best_d[k - 1]:
+                break
+            d = _dtw_abandoning(coords, offsets[i], offsets[i + 1], offsets[j], offsets[j + 1], best_d[k - 1])
+            if d < best_d[k - 1] or (d == best_d[k - 1] and j < best_j[k - 1]):
+                pos = k - 1
+                while pos > 0 and (best_d[pos - 1] > d or (best_d[pos - 1] == d and best_j[pos - 1] > j)):
+                    best_d[pos] = best_d[pos - 1]
+                    best_j[pos] = best_j[pos - 1]
+                    pos -= 1
+                best_d[pos] = d
+                best_j[pos] = j
+    return out_idx, out_dist
+
+
+@profiled("knn_graph", items_in=lambda traj_list, *args, **kwargs: len(traj_list), items_out=lambda graph: graph.nnz, drops=False)
+def dtw_knn_graph(traj_list: list, k: int = 10, chunk: int = 4096, workers: int = -1) -> csr_matrix:
+    """
+    Exact k-nearest-neighbour graph under DTW, as an (n, n) CSR matrix whose row i holds the
+    distances to the k nearest other trajectories (distance 0 to duplicates is stored explicitly)
+
+    Candidates come from a KD-tree on the first and last points: a first pass finds an upper bound
+    on each trajectory's k-th distance, and a ball query of that radius yields every trajectory
+    that can beat it. Candidates are then checked by increasing lower bound (LB_Kim and bounding
+    boxes) with early-abandoning DTW, in parallel over rows (numba threads; `workers` is passed to
+    the KD-tree queries). `chunk` rows are queried at a time to bound the candidate memory.
+    """
+    n = len(traj_list)
+    k = min(k, n - 1)
+    if k <= 0:
+        return csr_matrix((n, n))
+
+    coords, offsets = pack_trajectories(traj_list)
+    starts = offsets[:-1]
+    boxes = np.hstack([np.minimum.reduceat(coords, starts), np.maximum.reduceat(coords, starts)])
+    # Between first/last point keys, |key_i - key_j| <= LB_Kim <= DTW, so the ball query never misses
+    # a neighbour; for two single points it is sqrt(2) * DTW, so those rows search a wider ball
+    keys = np.hstack([coords[starts], coords[offsets[1:] - 1]])
+    widen = np.where(np.diff(offsets) == 1, np.sqrt(2), 1.0)
+    tree = cKDTree(keys)
+    n_first = min(4 * k + 1, n)
+
+    indices = np.empty((n, k), dtype=np.int64)
+    distances = np.empty((n, k))
+    for start in range(0, n, chunk):
+        rows = np.arange(start, min(start + chunk, n))
+        _, first = tree.query(keys[rows], k=n_first, workers=workers)
+        first_ptr = np.arange(0, first.size + 1, n_first, dtype=np.int64)
+        unbounded = np.full(len(rows), np.inf)
+        _, upper = _top_k(coords, offsets, boxes, rows, first_ptr, first.reshape(-1).astype(np.int64), k, unbounded)
+
+        upper = upper[:, -1] * (1 + 1e-9) + 1e-12
+        balls = tree.query_ball_point(keys[rows], upper * widen[rows], workers=workers, return_sorted=False)
+        cand_ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(ball) for ball in balls], out=cand_ptr[1:])
+        cand_idx = np.fromiter(chain.from_iterable(balls), dtype=np.int64, count=cand_ptr[-1])
+        indices[rows], distances[rows] = _top_k(coords, offsets, boxes, rows, cand_ptr, cand_idx, k, upper)
+
+    indptr = np.arange(0, n * k + 1, k, dtype=np.int64)
+    return csr_matrix((distances.reshape(-1), indices.reshape(-1), indptr), shape=(n, n))
@@ -0,0 +1,153 @@
+import numpy as np
+from numba import njit, prange
+from scipy.sparse import csr_matrix
+
+
+@njit(cache=True)
+def _digamma(x: float) -> float:
+    """
+    Digamma for x > 0: recurrence up to x >= 6, then the asymptotic series (absolute error below 1e-10)
+    """
+    result = 0.0
+    while x < 6.0:
+        result -= 1.0 / x
+        x += 1.0
+    inv = 1.0 / x
+    inv2 = inv * inv
+    return result + np.log(x) - 0.5 * inv - inv2 * (1.0 / 12 - inv2 * (1.0 / 120 - inv2 * (1.0 / 252 - inv2 * (1.0 / 240 - inv2 * (1.0 / 132)))))
+
+
+@njit(cache=True)
+def _exp_dirichlet_expectation(gamma: np.ndarray, out: np.ndarray):
+    psi_sum = _digamma(gamma.sum())
+    for k in range(len(gamma)):
+        out[k] = np.exp(_digamma(gamma[k]) - psi_sum)
+
+
+@njit(parallel=True, cache=True)
+def _fold_in(indptr, indices, data, exp_elog_beta, alpha, init, iterations, gamma_threshold, epsilon):
+    """
+    gensim's LdaModel.inference E-step for every CSR row, starting from the rows of init
+    """
+    n_docs = len(indptr) - 1
+    n_topics = exp_elog_beta.shape[0]
+    gamma = np.empty((n_docs, n_topics))
+    for d in prange(n_docs):
+        start, stop = indptr[d], indptr[d + 1]
+        n_words = stop - start
+        beta_d = np.empty((n_topics, n_words))
+        for k in range(n_topics):
+            for w in range(n_words):
+                beta_d[k, w] = exp_elog_beta[k, indices[start + w]]
+
+        gammad = init[d].copy()
+        new_gammad = np.empty(n_topics)
+        exp_theta = np.empty(n_topics)
+        phinorm = np.empty(n_words)
+        _exp_dirichlet_expectation(gammad, exp_theta)
+        for w in range(n_words):
+            phinorm[w] = epsilon
+            for k in range(n_topics):
+                phinorm[w] += exp_theta[k] * beta_d[k, w]
+
+        for _ in range(iterations):
+            for k in range(n_topics):
+                dot = 0.0
+                for w in range(n_words):
+                    dot += data[start + w] / phinorm[w] * beta_d[k, w]
+                new_gammad[k] = alpha[k] + exp_theta[k] * dot
+            _exp_dirichlet_expectation(new_gammad, exp_theta)
+            for w in range(n_words):
+                phinorm[w] = epsilon
+                for k in range(n_topics):
+                    phinorm[w] += exp_theta[k] * beta_d[k, w]
+
+            change = 0.0
+            for k in range(n_topics):
+                change += abs(new_gammad[k] - gammad[k])
+                gammad[k] = new_gammad[k]
+            if change / n_topics < gamma_threshold:
+                break
+        gamma[d] = gammad
+    return gamma
+
+
+def bows_to_csr(bows: list[list[tuple[int, float]]], num_terms: int) -> csr_matrix:
+    """
+    (documents x terms) count matrix of gensim bag-of-words documents
+    """
+    lengths = np.array([len(bow) for bow in bows], dtype=np.int64)
+    indptr = np.zeros(len(bows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((token_id for bow in bows for token_id, _ in bow), dtype=np.int64, count=indptr[-1])
+    data = np.fromiter((count for bow in bows for _, count in bow), dtype=np.float64, count=indptr[-1])
+    return csr_matrix((data, indices, indptr), shape=(len(bows), num_terms))
+
+
+class LdaScorer:
+    """
+    Compiled fold-in inference of topic distributions for new documents
+
+    Holds the trained exp(E[log beta]) topic-word matrix and alpha of an LdaModel and runs gensim's
+    variational E-step for a whole CSR batch of documents in parallel (numba prange over documents).
+    gensim starts every document from a random gamma; the scorer starts from ones, so results are
+    deterministic. Given gensim's starting gamma (`init`) it reproduces gensim's output to about 1e-5;
+    from its own start it agrees up to the gamma_threshold tolerance, except for the rare documents whose
+    posterior has several modes, on which two gensim runs disagree as well.
+    `save`/`load` keep the arrays in a .npz file, so scoring does not need gensim or the model pickle.
+    """
+
+    def __init__(self, exp_elog_beta: np.ndarray, alpha: np.ndarray, iterations: int = 50,
+                 gamma_threshold: float = 0.001, epsilon: float = np.finfo(np.float32).eps):
+        self.exp_elog_beta = np.ascontiguousarray(exp_elog_beta, dtype=np.float64)
+        self.alpha = np.ascontiguousarray(alpha, dtype=np.float64)
+        self.iterations = int(iterations)
+        self.gamma_threshold = float(gamma_threshold)
+        self.epsilon = float(epsilon)
+
+    @property
+    def num_topics(self) -> int:
+        return self.exp_elog_beta.shape[0]
+
+    @property
+    def num_terms(self) -> int:
+        return self.exp_elog_beta.shape[1]
+
+    @classmethod
+    def from_model(cls, lda_model) -> "LdaScorer":
+        """
+        Extracts the topic-word matrix and inference settings of a trained gensim LdaModel once
+        """
+        return cls(lda_model.expElogbeta, lda_model.alpha, lda_model.iterations, lda_model.gamma_threshold,
+                   np.finfo(lda_model.dtype).eps)
+
+    def save(self, path):
+        np.savez(path, exp_elog_beta=self.exp_elog_beta, alpha=self.alpha, iterations=self.iterations,
+                 gamma_threshold=self.gamma_threshold, epsilon=self.epsilon)
+
+    @classmethod
+    def load(cls, path) -> "LdaScorer":
+        with np.load(path) as arrays:
+            return cls(arrays["exp_elog_beta"], arrays["alpha"], int(arrays["iterations"]),
+                       float(arrays["gamma_threshold"]), float(arrays["epsilon"]))
+
+    def gamma(self, counts: csr_matrix, init: np.ndarray = None) -> np.ndarray:
+        """
+        Variational Dirichlet parameters of every row of a (documents x terms) count matrix whose
+        columns are the model's token ids (see DocumentTermMatrix.model_counts)
+
+        init is the (documents x topics) starting gamma, ones by default; gensim draws it from Gamma(100, 1/100)
+        """
+        counts = csr_matrix(counts)
+        if counts.shape[1] > self.num_terms:
+            raise ValueError(f"counts has {counts.shape[1]} term columns, the model {self.num_terms}")
+        init = np.ones((counts.shape[0], self.num_topics)) if init is None else np.ascontiguousarray(init, dtype=np.float64)
+        return _fold_in(counts.indptr.astype(np.int64), counts.indices.astype(np.int64), counts.data.astype(np.float64),
+                        self.exp_elog_beta, self.alpha, init, self.iterations, self.gamma_threshold, self.epsilon)
+
+    def topic_distributions(self, counts: csr_matrix, init: np.ndarray = None) -> np.ndarray:
+        """
+        (documents x topics) topic distributions, as get_document_topics computes them before dropping tiny topics
+        """
+        gamma = self.gamma(counts, init)
+        return gamma / gamma.sum(axis=1, keepdims=True)
@@ -1,6 +1,7 @@
 from shapely.geometry import LineString
 import math
 import numpy as np
+from .profiling import profiled
 
 class RemoveNoise:
     def __init__(self, trajec_lst):
@@ -168,10 +169,15 @@ class RemoveNoise:
 
         return False
 
-    def find_noise_indices(self):
+    def find_noise_indices(self, pool=None):
         """
         Returns a list of indices corresponding to trajectories in coordinates_list that are considered noise.
+        pool: a SharedWorkerPool built over trajec_lst checks the trajectories in its workers
         """
+        if pool is not None:
+            if pool.n_trajectories != len(self.trajec_lst):
+                raise ValueError("pool was built over different trajectories")
+            return pool.noise_indices()
         noise_indices = []
         for idx, trajectory in enumerate(self.trajec_lst):
             if self.is_noise_trajectory(trajectory):
@@ -183,7 +189,8 @@ class RemoveNoise:
         idxs = set(idxs)
         return [e for i, e in enumerate(iter) if i not in idxs]
     
-    def remove_noise(self):
-        idx = self.find_noise_indices()
+    @profiled("noise_removal", items_in=lambda self, *args, **kwargs: len(self.trajec_lst), items_out=len)
+    def remove_noise(self, pool=None):
+        idx = self.find_noise_indices(pool)
         self.trajec_lst = self.remove_by_indices(self.trajec_lst, idx)
         return self.trajec_lst
\ No newline at end of file
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from .profiling import profiled
 
 class SplitPossessionPhases:
 
@@ -140,6 +141,8 @@ class SplitPossessionPhases:
         return phase_events
 
 
+    @profiled("phase_split", items_in=lambda self, actions, *args, **kwargs: len(actions),
+              items_out=lambda phases: sum(len(phase) for team_phases in phases[1::2] for phase in team_phases))
     def split_possession_phases(self, actions: pd.DataFrame, team_name_mapping: dict[int, str]):
         """
         Splits possession sequences for each team into distinct phases.
@@ -241,11 +244,13 @@ class FilterPhases:
 
         self.phase = valid_sequences
 
+    @profiled("filtering", items_in=lambda self: len(self.phase), items_out=len)
     def filter(self):
         self.remove_unwanted_actions()
         self.filter_invalid_sequences()
         return self.phase
     
+@profiled("chain_building", items_in=lambda phase: len(phase), items_out=len, drops=False)
 def MakeMovementChains(phase: list[list[dict]]) -> list[list[dict]]:
     movement_chains = []
     for seq in phase:
@@ -0,0 +1,245 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def content_hash(value) -> str:
+    """
+    sha256 of a value's content: raw buffers for arrays and DataFrames, pickle bytes otherwise
+    (pickled sets are not ordered deterministically across interpreter runs; pass sorted lists instead)
+    """
+    h = hashlib.sha256()
+    if isinstance(value, np.ndarray):
+        h.update(f"{value.dtype}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else pickle.dumps(value.tolist(), protocol=4))
+    elif isinstance(value, pd.DataFrame):
+        h.update(pickle.dumps(list(value.columns), protocol=4))
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    else:
+        h.update(pickle.dumps(value, protocol=4))
+    return h.hexdigest()
+
+
+_PACKAGE = __name__.rpartition(".")[0]
+
+
+def _package_module(value) -> str:
+    """
+    Name of the playstyle_utils module a module, function, class or instance comes from, else None
+    """
+    name = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+    if isinstance(name, str) and (name == _PACKAGE or name.startswith(_PACKAGE + ".")):
+        return name
+    return None
+
+
+def _code_objects(code):
+    yield code
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            yield from _code_objects(const)
+
+
+def _walk(func, sources: list, modules: set, seen: set):
+    """
+    Collects the source of func and of the plain functions it references by name, and the package
+    modules they reference; functions of the package are covered by their module's source
+    """
+    if isinstance(func, functools.partial):
+        _walk(func.func, sources, modules, seen)
+        sources.append(content_hash((func.args, sorted(func.keywords.items()))).encode())
+        return
+    func = getattr(func, "__func__", func)
+    if not inspect.isfunction(func):
+        raise TypeError(f"cannot hash the code of {func!r}; give the stage an explicit version")
+    if func in seen:
+        return
+    seen.add(func)
+    module = _package_module(func)
+    if module is not None:
+        modules.add(module)
+        return
+
+    try:
+        sources.append(inspect.getsource(func).encode())
+    except (OSError, TypeError):
+        sources.append(func.__code__.co_code)
+        sources.append(repr(func.__code__.co_consts).encode())
+    referenced = [func.__globals__[name] for code in _code_objects(func.__code__)
+                  for name in code.co_names if name in func.__globals__]
+    for cell in func.__closure__ or ():
+        try:
+            referenced.append(cell.cell_contents)
+        except ValueError:
+            pass
+    for value in referenced:
+        module = _package_module(value)
+        if module is not None:
+            modules.add(module)
+        elif inspect.isfunction(value) or isinstance(value, functools.partial):
+            _walk(value, sources, modules, seen)
+
+
+def stage_modules(func) -> list[str]:
+    """
+    playstyle_utils modules whose source is part of a stage's code hash: the ones it references and,
+    transitively, the package modules those reference
+    """
+    modules = set()
+    _walk(func, [], modules, set())
+    pending = list(modules)
+    while pending:
+        for value in vars(sys.modules[pending.pop()]).values():
+            module = _package_module(value)
+            if module is not None and module not in modules:
+                modules.add(module)
+                pending.append(module)
+    return sorted(modules)
+
+
+def code_hash(func) -> str:
+    """
+    Hash of a stage's code: the source of the function and of the plain functions it calls by name, plus
+    the source of the playstyle_utils modules they use (see stage_modules); edits to other package modules
+    leave the stage cached. Code outside the package that a stage calls is not hashed; bump the stage's
+    version when it changes. functools.partial stages also hash their bound arguments; callables without
+    Python source (builtins, callable objects) raise TypeError unless the stage has an explicit version
+    """
+    h = hashlib.sha256()
+    sources = []
+    _walk(func, sources, set(), set())
+    for source in sources:
+        h.update(source)
+    for name in stage_modules(func):
+        h.update(name.encode())
+        h.update(Path(sys.modules[name].__file__).read_bytes())
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Directory of pickled stage outputs, keyed by stage name and fingerprint
+    """
+
+    def __init__(self, root="data/cache"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, name: str, fingerprint: str) -> Path:
+        return self.root / f"{name}-{fingerprint[:20]}.pkl"
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        return self.path(*key).exists()
+
+    def load(self, name: str, fingerprint: str):
+        with open(self.path(name, fingerprint), "rb") as f:
+            return pickle.load(f)
+
+    def save(self, name: str, fingerprint: str, value):
+        path = self.path(name, fingerprint)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Atomic rename, so an interrupted run never leaves a truncated artifact behind
+        os.replace(tmp, path)
+
+
+class Pipeline:
+    """
+    Runs playstyle_utils stages, skipping every stage whose inputs, parameters and code are unchanged
+
+    A stage's fingerprint hashes its name, code, version, parameters and the fingerprints of its inputs,
+    so only source data is ever hashed by content. When a fingerprint is in the cache the output is loaded
+    from disk and nothing upstream of it is computed or even loaded.
+
+    pipeline = Pipeline(ArtifactCache("data/cache"))
+    pipeline.source("match_events", match_events)
+    pipeline.add("phases", make_phases, inputs=["match_events"], params={"gap": 10})
+    pipeline.add("chains", make_chains, inputs=["phases"])
+    chains = pipeline.run("chains")
+    """
+
+    def __init__(self, cache: ArtifactCache):
+        self.cache = cache
+        self.sources = {}
+        self.stages = {}
+        self.log = []
+        self._fingerprints = {}
+        self._values = {}
+
+    def source(self, name: str, value, fingerprint: str = None):
+        """
+        Registers an input value; its fingerprint is its content hash unless one is given
+        """
+        self.sources[name] = value
+        self._fingerprints[name] = fingerprint or content_hash(value)
+        self._reset_stages()
+
+    def add(self, name: str, func, inputs=(), params: dict = None, version: str = ""):
+        """
+        Registers a stage computing func(*inputs, **params); bump version to force a rerun
+        (needed when code outside playstyle_utils that func calls changes, and required for builtins
+        and callable objects, whose code cannot be hashed)
+        """
+        self.stages[name] = {"func": func, "inputs": list(inputs), "params": params or {}, "version": version}
+        self._reset_stages()
+
+    def _reset_stages(self):
+        # Changing a source or a stage invalidates the memoised fingerprints and values of every stage
+        self._fingerprints = {source: self._fingerprints[source] for source in self.sources}
+        self._values = dict(self.sources)
+
+    def fingerprint(self, name: str) -> str:
+        if name not in self._fingerprints:
+            stage = self.stages[name]
+            h = hashlib.sha256()
+            h.update(name.encode())
+            try:
+                h.update(code_hash(stage["func"]).encode())
+            except TypeError:
+                # Callables without source are identified by their version alone
+                if not stage["version"]:
+                    raise
+            h.update(stage["version"].encode())
+            # Values are hashed by content: reprs of large arrays are abbreviated
+            for key in sorted(stage["params"]):
+                h.update(key.encode())
+                h.update(content_hash(stage["params"][key]).encode())
+            for input_name in stage["inputs"]:
+                h.update(self.fingerprint(input_name).encode())
+            self._fingerprints[name] = h.hexdigest()
+        return self._fingerprints[name]
+
+    def value(self, name: str):
+        if name in self._values:
+            return self._values[name]
+
+        fingerprint = self.fingerprint(name)
+        if (name, fingerprint) in self.cache:
+            value = self.cache.load(name, fingerprint)
+            self.log.append((name, "cached"))
+        else:
+            stage = self.stages[name]
+            args = [self.value(input_name) for input_name in stage["inputs"]]
+            value = stage["func"](*args, **stage["params"])
+            self.cache.save(name, fingerprint, value)
+            self.log.append((name, "computed"))
+        self._values[name] = value
+        return value
+
+    def run(self, targets=None):
+        """
+        Returns the value of one target, or a dict of values for several (default: every stage)
+        """
+        if isinstance(targets, str):
+            return self.value(targets)
+        if targets is None:
+            targets = list(self.stages)
+        return {name: self.value(name) for name in targets}
@@ -0,0 +1,147 @@
+import csv
+import functools
+import io
+import json
+import time
+import tracemalloc
+
+# Profilers currently collecting; stages are only measured while one is active
+_active_profilers = []
+
+
+class StageProfiler:
+    """
+    Collects wall time, peak traced memory and items in/out for every profiled pipeline stage
+
+    with StageProfiler() as profiler:
+        phases = SplitPossessionPhases().split_possession_phases(actions, team_name_mapping)
+        ...
+    profiler.to_csv("stages.csv")
+
+    Peak memory is the tracemalloc peak above the memory in use when the stage started
+    (numpy buffers are traced, numba's internal allocations are not)
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._frames = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _active_profilers.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active_profilers.remove(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def start(self, stage: str, items_in=None, drops: bool = True) -> dict:
+        record = {"stage": stage, "items_in": items_in, "items_out": None, "items_dropped": None, "seconds": 0.0,
+                  "peak_mb": None, "_drops": drops}
+        frame = {"record": record, "max_peak": 0, "start_memory": 0}
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # reset_peak would hide the enclosing stage's peak so far, so hand it to the parent first
+            if self._frames:
+                self._frames[-1]["max_peak"] = max(self._frames[-1]["max_peak"], peak)
+            tracemalloc.reset_peak()
+            frame["start_memory"] = current
+        self._frames.append(frame)
+        record["_start"] = time.perf_counter()
+        return record
+
+    def stop(self, record: dict, items_out=None):
+        record["seconds"] = time.perf_counter() - record.pop("_start")
+        record["items_out"] = items_out
+        if record.pop("_drops") and record["items_in"] is not None and items_out is not None:
+            record["items_dropped"] = record["items_in"] - items_out
+        frame = self._frames.pop()
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], frame["max_peak"])
+            record["peak_mb"] = (peak - frame["start_memory"]) / 2**20
+            if self._frames:
+                self._frames[-1]["max_peak"] = max(self._frames[-1]["max_peak"], peak)
+        self.records.append(record)
+
+    def summary(self) -> list[dict]:
+        """
+        Totals per stage: calls, seconds, items in/out/dropped and the largest peak memory
+        """
+        stages = {}
+        for record in self.records:
+            total = stages.setdefault(record["stage"], {"stage": record["stage"], "calls": 0, "seconds": 0.0,
+                                                         "items_in": None, "items_out": None, "items_dropped": None, "peak_mb": None})
+            total["calls"] += 1
+            total["seconds"] += record["seconds"]
+            # Counts stay None for stages that never report them
+            for count in ["items_in", "items_out", "items_dropped"]:
+                if record[count] is not None:
+                    total[count] = (total[count] or 0) + record[count]
+            if record["peak_mb"] is not None:
+                total["peak_mb"] = max(total["peak_mb"] or 0.0, record["peak_mb"])
+        return sorted(stages.values(), key=lambda total: total["seconds"], reverse=True)
+
+    def bottleneck(self) -> str:
+        """
+        Name of the stage with the largest total wall time
+        """
+        summary = self.summary()
+        return summary[0]["stage"] if summary else None
+
+    def to_json(self, path=None, aggregate: bool = True) -> str:
+        rows = self.summary() if aggregate else self.records
+        text = json.dumps(rows, indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_csv(self, path=None, aggregate: bool = True) -> str:
+        rows = self.summary() if aggregate else self.records
+        buffer = io.StringIO()
+        if rows:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        text = buffer.getvalue()
+        if path is not None:
+            with open(path, "w", newline="") as f:
+                f.write(text)
+        return text
+
+
+def profiled(stage: str, items_in=None, items_out=None, drops: bool = True):
+    """
+    Marks a function as a pipeline stage for the active StageProfiler(s)
+
+    items_in(*args, **kwargs) and items_out(result) count the items going in and out of the stage;
+    drops=False marks stages that count their outputs in other units (e.g. trajectories in, distances out),
+    which then report no items_dropped. Without an active profiler the function is called directly
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _active_profilers:
+                return func(*args, **kwargs)
+
+            n_in = items_in(*args, **kwargs) if items_in is not None else None
+            records = [(profiler, profiler.start(stage, n_in, drops)) for profiler in _active_profilers]
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                for profiler, record in reversed(records):
+                    profiler.stop(record)
+                raise
+            n_out = items_out(result) if items_out is not None else None
+            for profiler, record in reversed(records):
+                profiler.stop(record, n_out)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,106 @@
+import argparse
+import re
+from multiprocessing import get_context
+from pathlib import Path
+
+from matplotlib.figure import Figure
+
+from .applications_utils import draw_style_comparison
+from .topic_store import TopicStore, load_topic_distributions
+
+CATEGORIES = ["Right flank", "Play high", "Midfield play", "Switch flank", "Left flank", "Play low"]
+
+# One figure per worker process, cleared and reused for every chart it renders
+_figure = None
+_axes = None
+
+
+def _init_worker(figsize):
+    global _figure, _axes
+    # A bare Figure renders through the Agg canvas on savefig, without any pyplot/GUI state
+    _figure = Figure(figsize=figsize)
+    _axes = _figure.subplots()
+
+
+def _render(chart: tuple) -> str:
+    path, title, first_style, second_style, labels, categories = chart
+    _axes.clear()
+    draw_style_comparison(_axes, title, first_style, second_style, labels, categories)
+    _figure.tight_layout()
+    _figure.savefig(path)
+    return path
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^\w-]+", "_", name).strip("_")
+
+
+def club_charts(store: TopicStore, out_dir, categories: list[str], teams=None, home_away=True, dates=(), fmt="png") -> list[tuple]:
+    """
+    Computes the styles of every requested chart; returns (path, title, style, style, labels, categories) specs
+    """
+    out_dir = Path(out_dir)
+    if teams is None:
+        teams = list(store.team_blocks)
+
+    charts = []
+    for team in teams:
+        league = store.team_leagues.get(team, "")
+        title = f"{team} - {league}"
+        team_dir = out_dir / (_slug(league) or "other")
+        team_dir.mkdir(parents=True, exist_ok=True)
+
+        if home_away:
+            styles = store.home_vs_away(team)
+            charts.append((str(team_dir / f"{_slug(team)}_home_away.{fmt}"), title,
+                           styles["home style"], styles["away style"], ("Home", "Away"), categories))
+        for date in dates:
+            styles = store.split_matches(team, date)
+            charts.append((str(team_dir / f"{_slug(team)}_{_slug(str(date))}.{fmt}"), title,
+                           styles[f"pre {date}"], styles[f"post {date}"], (f"pre {date}", f"post {date}"), categories))
+    return charts
+
+
+def render_club_charts(store: TopicStore, out_dir, categories: list[str] = CATEGORIES, teams=None, home_away=True,
+                       dates=(), fmt="png", processes=None, figsize=(8, 5)) -> list[str]:
+    """
+    Renders home/away and pre/post-date style charts for every requested club to files, headless
+
+    The styles are computed up front from the store, so workers only receive a few small arrays per chart.
+    processes=1 renders in the calling process
+    """
+    charts = club_charts(store, out_dir, categories, teams, home_away, dates, fmt)
+    if processes == 1:
+        _init_worker(figsize)
+        return [_render(chart) for chart in charts]
+
+    # Spawned workers: forking after numba's parallel kernels have started their threads can hang
+    with get_context("spawn").Pool(processes, initializer=_init_worker, initargs=(figsize,)) as pool:
+        return list(pool.imap_unordered(_render, charts, chunksize=8))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render club style charts for every club to image files")
+    parser.add_argument("--data", default="data/derived", help="directory with the derived notebook pickles")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--leagues", nargs="*", help="only render clubs of these leagues")
+    parser.add_argument("--dates", nargs="*", default=[], help="pre/post split dates, e.g. 2017-12-10")
+    parser.add_argument("--no-home-away", action="store_true", help="skip the home vs away charts")
+    parser.add_argument("--format", default="png")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    df_matches, topic_distributions_data = load_topic_distributions(args.data)
+    store = TopicStore.from_distributions(df_matches, topic_distributions_data)
+
+    teams = None
+    if args.leagues:
+        teams = [team for league in args.leagues for team in store.league_teams(league)]
+
+    paths = render_club_charts(store, args.out, teams=teams, home_away=not args.no_home_away,
+                               dates=args.dates, fmt=args.format, processes=args.processes)
+    print(f"Rendered {len(paths)} charts to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import json
+import math
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+
+from .applications_utils import style_metrics
+from .similarity_index import StyleIndex
+from .topic_store import TopicStore, load_derived, topic_distributions_from_model
+
+
+class StyleService:
+    """
+    Answers club style queries from a topic store, similarity index and LDA model held in memory
+
+    Answers are memoised in an LRU cache keyed by endpoint and parameters
+    """
+
+    def __init__(self, df_matches, topic_distributions_data: dict, lda_model=None, cache_size: int = 4096):
+        self.store = TopicStore.from_distributions(df_matches, topic_distributions_data)
+        self.index = StyleIndex.from_store(self.store)
+        self.lda_model = lda_model
+        self._cached_answer = lru_cache(maxsize=cache_size)(self._answer)
+
+    @classmethod
+    def from_directory(cls, data_dir, **kwargs) -> "StyleService":
+        """
+        Loads the derived notebook pickles once
+        """
+        derived = load_derived(data_dir)
+        topic_distributions_data = topic_distributions_from_model(derived["lda_model"], derived["corpus_train"],
+                                                                  derived["movement_chain_clusters"])
+        return cls(derived["df_matches"], topic_distributions_data, derived["lda_model"], **kwargs)
+
+    def answer(self, endpoint: str, params: dict):
+        return self._cached_answer(endpoint, tuple(sorted(params.items())))
+
+    def _team(self, params: dict) -> str:
+        team = params.get("team")
+        if team not in self.store.team_blocks:
+            raise KeyError(f"unknown team {team!r}")
+        return team
+
+    def _answer(self, endpoint: str, params: tuple):
+        params = dict(params)
+        if endpoint == "clubs":
+            return [{"team": team, "league": league} for team, league in self.store.team_leagues.items()]
+
+        if endpoint == "club_style":
+            team = self._team(params)
+            return {"team": team, "league": self.store.team_leagues[team],
+                    "style": self.store.style(self.store.team_rows(team)).tolist()}
+
+        if endpoint == "home_away":
+            team = self._team(params)
+            styles = self.store.home_vs_away(team)
+            return {"team": team, **{key: value.tolist() for key, value in styles.items()}}
+
+        if endpoint == "split":
+            team = self._team(params)
+            if "date" not in params:
+                raise ValueError("missing parameter 'date'")
+            styles = self.store.split_matches(team, params["date"])
+            return {"team": team, **{key: value.tolist() for key, value in styles.items()}}
+
+        if endpoint == "similar":
+            team = self._team(params)
+            neighbours = self.index.knn(key=team, k=int(params.get("k", 5)), kind=params.get("kind", "club"),
+                                        league=params.get("league"), season=params.get("season"))
+            return {"team": team, "similar": [{"key": key, "distance": distance} for key, distance in neighbours]}
+
+        if endpoint == "metrics":
+            metrics = style_metrics(self.store, params.get("league"))
+            return metrics.to_dict(orient="records")
+
+        if endpoint == "topics":
+            if self.lda_model is None:
+                raise ValueError("no LDA model loaded")
+            topn = int(params.get("topn", 10))
+            return [{"topic": topic, "medoids": [{"medoid": token, "weight": float(weight)}
+                                                  for token, weight in self.lda_model.show_topic(topic, topn=topn)]}
+                    for topic in range(self.lda_model.num_topics)]
+
+        raise LookupError(f"unknown endpoint {endpoint!r}")
+
+
+def make_handler(service: StyleService):
+    class StyleRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                body, status = service.answer(url.path.strip("/"), dict(parse_qsl(url.query))), 200
+            except KeyError as e:
+                body, status = {"error": e.args[0]}, 404
+            except LookupError as e:
+                body, status = {"error": str(e)}, 404
+            except ValueError as e:
+                body, status = {"error": str(e)}, 400
+            except Exception as e:
+                body, status = {"error": f"internal error: {type(e).__name__}"}, 500
+
+            payload = json.dumps(_to_json(body), allow_nan=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StyleRequestHandler
+
+
+def _to_json(value):
+    """
+    JSON-ready copy of an answer; NaN (e.g. the style of an empty split window) and infinities become null
+    """
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return _to_json(value.tolist())
+    if isinstance(value, np.generic):
+        return _to_json(value.item())
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if value is None or isinstance(value, (str, int)):
+        return value
+    return str(value)
+
+
+def serve(service: StyleService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Creates a threaded HTTP server for the service; call serve_forever() on it
+    """
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve club style queries over local HTTP/JSON")
+    parser.add_argument("--data", default="data/derived", help="directory with the derived notebook pickles")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    args = parser.parse_args(argv)
+
+    service = StyleService.from_directory(args.data, cache_size=args.cache_size)
+    server = serve(service, args.host, args.port)
+    print(f"Serving {len(service.store.team_blocks)} clubs on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
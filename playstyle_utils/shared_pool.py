@@ -0,0 +1,250 @@
+import os
+from contextlib import contextmanager
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+from numba import njit
+
+from .dtw import condensed_to_square, dtw_distance_numba, pack_trajectories
+from .noise import RemoveNoise
+
+# Worker-side attachments of the pool's trajectories, kept for the worker's lifetime
+_worker = {"arrays": {}, "blocks": []}
+
+
+class SharedArrays:
+    """
+    Named numpy arrays copied once into shared memory blocks
+
+    `handle` is a small picklable description that other processes pass to `attach` to map the same
+    memory without copying. The creating process owns the blocks and unlinks them in `close`.
+    A (shape, dtype) pair instead of an array allocates a zeroed block without a source copy (for outputs).
+    """
+
+    def __init__(self, arrays: dict):
+        self.arrays = {}
+        self.handle = {}
+        self._blocks = []
+        for name, array in arrays.items():
+            if isinstance(array, tuple):
+                shape, dtype = array
+                array = None
+            else:
+                array = np.ascontiguousarray(array)
+                shape, dtype = array.shape, array.dtype
+            dtype = np.dtype(dtype)
+            # Zero-sized blocks are not allowed; new blocks are zero-filled
+            shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+            self._blocks.append(shm)
+            view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            if array is not None:
+                view[...] = array
+            self.arrays[name] = view
+            self.handle[name] = (shm.name, shape, dtype.str)
+
+    @staticmethod
+    def attach(handle: dict) -> tuple[dict[str, np.ndarray], list]:
+        """
+        Maps the blocks of a handle; the returned blocks must stay referenced while the arrays are used
+        """
+        arrays, blocks = {}, []
+        for name, (shm_name, shape, dtype) in handle.items():
+            shm = shared_memory.SharedMemory(name=shm_name)
+            blocks.append(shm)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        return arrays, blocks
+
+    def close(self):
+        # Views must be dropped before their buffer can be closed
+        self.arrays.clear()
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+
+def _init_worker(handle: dict):
+    _worker["arrays"], _worker["blocks"] = SharedArrays.attach(handle)
+
+
+@contextmanager
+def _call_arrays(handle: dict):
+    """
+    Arrays of a call (medoids, outputs), mapped for one task only so that no worker holds on to a
+    block after the call unlinks it; views into them must not outlive the with block
+    """
+    arrays, blocks = SharedArrays.attach(handle)
+    try:
+        yield arrays
+    finally:
+        arrays.clear()
+        for shm in blocks:
+            shm.close()
+
+
+@njit(cache=True)
+def _nearest_medoids(coords, offsets, start, stop, medoid_coords, medoid_offsets, labels):
+    n_medoids = len(medoid_offsets) - 1
+    for t in range(start, stop):
+        traj = coords[offsets[t]:offsets[t + 1]]
+        best_idx = 0
+        best_dist = np.inf
+        for m in range(n_medoids):
+            dist = dtw_distance_numba(traj, medoid_coords[medoid_offsets[m]:medoid_offsets[m + 1]])
+            if dist < best_dist:
+                best_dist = dist
+                best_idx = m
+        labels[t] = best_idx
+
+
+@njit(cache=True)
+def _distance_rows(coords, offsets, start, stop, distances):
+    n = len(offsets) - 1
+    for i in range(start, stop):
+        base = n * i - i * (i + 1) // 2 - i - 1
+        traj = coords[offsets[i]:offsets[i + 1]]
+        for j in range(i + 1, n):
+            distances[base + j] = dtw_distance_numba(traj, coords[offsets[j]:offsets[j + 1]])
+
+
+def _noise_flags(coords, offsets, start, stop, noise):
+    remover = RemoveNoise([])
+    for t in range(start, stop):
+        noise[t] = remover.is_noise_trajectory(coords[offsets[t]:offsets[t + 1]].tolist())
+
+
+def _assign_task(task):
+    start, stop, handle = task
+    shared = _worker["arrays"]
+    with _call_arrays(handle) as call:
+        _nearest_medoids(shared["coords"], shared["offsets"], start, stop, call["coords"], call["offsets"], call["labels"])
+
+
+def _distance_task(task):
+    start, stop, handle = task
+    shared = _worker["arrays"]
+    with _call_arrays(handle) as call:
+        _distance_rows(shared["coords"], shared["offsets"], start, stop, call["distances"])
+
+
+def _noise_task(task):
+    start, stop, handle = task
+    shared = _worker["arrays"]
+    with _call_arrays(handle) as call:
+        _noise_flags(shared["coords"], shared["offsets"], start, stop, call["noise"])
+
+
+class SharedWorkerPool:
+    """
+    Process pool whose workers map the trajectory coordinates from shared memory instead of receiving copies
+
+    Trajectories (a list, or a dict of lists such as all_movement_chain_coordinates) are packed once into
+    shared memory and every worker attaches to them at startup; tasks only carry index ranges and the
+    handles of small per-call blocks (medoids, outputs), and workers write results straight into those.
+Workers map a call's blocks for one task at a time, so a call's memory is freed as soon as it returns.
+
+    with SharedWorkerPool(all_movement_chain_coordinates, processes=8) as pool:
+        assignments = assign_to_nearest_medoids(medoid_indices, medoid_trajs, all_movement_chain_coordinates, pool=pool)
+
+    Workers are spawned rather than forked, which is safe after numba's parallel kernels have run.
+    Leaving the with block (or calling close) stops the workers and unlinks every shared block.
+    """
+
+    def __init__(self, trajectories, processes: int = None, dtype=np.float64, chunk: int = 512):
+        if isinstance(trajectories, dict):
+            self.keys = list(trajectories)
+            self.counts = [len(trajectories[key]) for key in self.keys]
+            traj_list = [traj for key in self.keys for traj in trajectories[key]]
+        else:
+            self.keys, self.counts = None, None
+            traj_list = trajectories
+        self.n_trajectories = len(traj_list)
+        self.dtype = np.dtype(dtype)
+        self.chunk = chunk
+
+        coords, offsets = pack_trajectories(traj_list, dtype)
+        self.shared = SharedArrays({"coords": coords, "offsets": offsets})
+        self.processes = processes or os.cpu_count()
+        try:
+            self._pool = get_context("spawn").Pool(self.processes, initializer=_init_worker, initargs=(self.shared.handle,))
+        except BaseException:
+            self.shared.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self.shared.close()
+
+    def _run(self, func, bounds: list[int], call: SharedArrays):
+        tasks = [(start, stop, call.handle) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        for _ in self._pool.imap_unordered(func, tasks):
+            pass
+
+    def _bounds(self) -> list[int]:
+        return list(range(0, self.n_trajectories, self.chunk)) + [self.n_trajectories]
+
+    def _as_input_shape(self, values: list):
+        if self.keys is None:
+            return values
+        result, start = {}, 0
+        for key, count in zip(self.keys, self.counts):
+            result[key] = values[start:start + count]
+            start += count
+        return result
+
+    def assign_to_nearest_medoids(self, medoid_indices: list[int], medoid_trajs: list[np.ndarray]):
+        """
+        Nearest medoid (by DTW) of every trajectory, shaped like the pool's input
+        """
+        medoid_coords, medoid_offsets = pack_trajectories(medoid_trajs, self.dtype)
+        call = SharedArrays({"coords": medoid_coords, "offsets": medoid_offsets,
+                             "labels": ((self.n_trajectories,), np.int64)})
+        try:
+            self._run(_assign_task, self._bounds(), call)
+            labels = np.asarray(medoid_indices)[call.arrays["labels"]].tolist()
+        finally:
+            call.close()
+        return self._as_input_shape(labels)
+
+    def noise_indices(self) -> list[int]:
+        """
+        Indices (into the flattened trajectories) that RemoveNoise flags as noise; build the pool with
+        dtype=np.float64 for results identical to RemoveNoise.find_noise_indices
+        """
+        call = SharedArrays({"noise": ((self.n_trajectories,), bool)})
+        try:
+            self._run(_noise_task, self._bounds(), call)
+            return np.flatnonzero(call.arrays["noise"]).tolist()
+        finally:
+            call.close()
+
+    def dtw_distance_matrix(self, dtype=np.float64, condensed: bool = False) -> np.ndarray:
+        """
+        DTW distances between all pool trajectories, as compute_dtw_distance_matrix returns them
+        The workers write straight into a shared block of the requested dtype
+        """
+        n = self.n_trajectories
+        call = SharedArrays({"distances": ((n * (n - 1) // 2,), dtype)})
+        # Row i has n - 1 - i pairs, so rows are cut into ranges of about equal work
+        pairs = np.concatenate([[0], np.cumsum(np.arange(n - 1, -1, -1))])
+        n_tasks = max(1, min(n, 4 * self.processes))
+        bounds = np.unique(np.searchsorted(pairs, np.linspace(0, pairs[-1], n_tasks + 1))).tolist()
+        bounds[-1] = n
+        try:
+            self._run(_distance_task, bounds, call)
+            distances = call.arrays["distances"]
+            # The block is unlinked below, so the result is copied out of it
+            distances = distances.copy() if condensed else condensed_to_square(distances)
+        finally:
+            call.close()
+        return distances
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from .topic_store import TopicStore, clr_rows
+
+
+def season_of(date) -> str:
+    """
+    Season label of a match date, e.g. 2018-03-01 -> "2017/18" (seasons start in July)
+    """
+    if pd.isna(date):
+        return ""
+    date = pd.Timestamp(date)
+    start = date.year if date.month >= 7 else date.year - 1
+    return f"{start}/{(start + 1) % 100:02d}"
+
+
+class StyleIndex:
+    """
+    Nearest-neighbour index over topic distributions in Aitchison geometry
+
+    Compositions are stored as CLR vectors, where the Aitchison distance is the Euclidean distance,
+    so a KD-tree answers k-nearest and radius queries exactly. Inserts go to a small buffer that is
+    searched by brute force and merged into the tree once it grows past `rebuild_threshold` rows.
+    Adding an existing key replaces its entry: the old row is masked out of every query and dropped
+    at the next rebuild.
+    """
+
+    def __init__(self, n_topics: int, rebuild_threshold: int = 512, brute_force_below: int = 2048):
+        self.rebuild_threshold = rebuild_threshold
+        self.brute_force_below = brute_force_below
+        self._clr = np.empty((0, n_topics))
+        self.keys = np.empty(0, dtype=object)
+        self.kinds = np.empty(0, dtype=object)
+        self.leagues = np.empty(0, dtype=object)
+        self.seasons = np.empty(0, dtype=object)
+        self._live = np.empty(0, dtype=bool)
+        self._n_dead = 0
+        self._positions = {}
+        self._tree = None
+        self._n_tree = 0
+
+    def __len__(self):
+        return len(self._positions)
+
+    def add(self, keys: list[str], compositions, kind: str = "match", leagues=None, seasons=None):
+        """
+        Inserts compositions (rows summing to 1) under the given keys, replacing the entries of keys already present
+        """
+        clr = clr_rows(np.atleast_2d(np.asarray(compositions, dtype=float)))
+        n = len(keys)
+        leagues = [""] * n if leagues is None else list(leagues)
+        seasons = [""] * n if seasons is None else list(seasons)
+
+        start = len(self.keys)
+        self._live = np.concatenate([self._live, np.ones(n, dtype=bool)])
+        for i, key in enumerate(keys):
+            old = self._positions.get(key)
+            if old is not None:
+                self._live[old] = False
+                self._n_dead += 1
+            self._positions[key] = start + i
+        self._clr = np.vstack([self._clr, clr])
+        self.keys = np.concatenate([self.keys, np.array(keys, dtype=object)])
+        self.kinds = np.concatenate([self.kinds, np.array([kind] * n, dtype=object)])
+        self.leagues = np.concatenate([self.leagues, np.array(leagues, dtype=object)])
+        self.seasons = np.concatenate([self.seasons, np.array(seasons, dtype=object)])
+
+        if len(self.keys) - self._n_tree + self._n_dead > self.rebuild_threshold:
+            self.rebuild()
+
+    def rebuild(self):
+        """
+        Drops replaced rows and builds the KD-tree over all the others
+        """
+        if self._n_dead:
+            live = self._live
+            self._clr, self.keys, self.kinds = self._clr[live], self.keys[live], self.kinds[live]
+            self.leagues, self.seasons = self.leagues[live], self.seasons[live]
+            self._live = np.ones(len(self.keys), dtype=bool)
+            self._n_dead = 0
+            self._positions = {key: i for i, key in enumerate(self.keys)}
+        self._tree = cKDTree(self._clr) if len(self.keys) else None
+        self._n_tree = len(self.keys)
+
+    @classmethod
+    def from_store(cls, store: TopicStore, matches: bool = True, clubs: bool = True, **kwargs) -> "StyleIndex":
+        """
+        Index of every match document and/or every club style of a TopicStore
+        """
+        index = cls(store.topics.shape[1], **kwargs)
+        if matches:
+            keys = [f"{game_id}_{team}" for game_id, team in zip(store.game_ids, store.teams)]
+            seasons = [season_of(date) for date in store.dates]
+            index.add(keys, store.topics, kind="match", leagues=store.leagues, seasons=seasons)
+        if clubs:
+            teams = list(store.team_blocks)
+            styles = store.club_styles(teams)
+            seasons = [season_of(store.dates[store.team_blocks[team][0]]) for team in teams]
+            index.add(teams, [styles[team] for team in teams], kind="club",
+                      leagues=[store.team_leagues[team] for team in teams], seasons=seasons)
+        index.rebuild()
+        return index
+
+    def vector(self, key: str) -> np.ndarray:
+        """
+        CLR vector stored under a key
+        """
+        return self._clr[self._positions[key]]
+
+    def _mask(self, kind, league, season, exclude) -> np.ndarray:
+        mask = self._live.copy()
+        if kind is not None:
+            mask &= self.kinds == kind
+        if league is not None:
+            mask &= self.leagues == league
+        if season is not None:
+            mask &= self.seasons == season
+        if exclude is not None:
+            mask[self._positions[exclude]] = False
+        return mask
+
+    def _query_clr(self, query, key):
+        if key is not None:
+            return self.vector(key)
+        return clr_rows(np.asarray(query, dtype=float)[None, :])[0]
+
+    def _brute_force(self, q: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return np.sqrt(((self._clr[rows] - q) ** 2).sum(axis=1))
+
+    def knn(self, query=None, k: int = 5, key: str = None, kind: str = None, league: str = None,
+            season: str = None) -> list[tuple[str, float]]:
+        """
+        The k nearest entries to a composition (or to the entry stored under `key`, which is excluded),
+        optionally restricted to one kind ("match"/"club"), league or season
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        q = self._query_clr(query, key)
+        mask = self._mask(kind, league, season, key)
+        n_valid = int(mask.sum())
+        k = min(k, n_valid)
+        if k == 0:
+            return []
+
+        if self._tree is None or n_valid <= self.brute_force_below:
+            rows = np.flatnonzero(mask)
+            dists = self._brute_force(q, rows)
+        else:
+            # Widen the tree query until enough of the results pass the filter
+            k_tree = min(2 * k, self._n_tree)
+            while True:
+                dists, rows = self._tree.query(q, k=k_tree)
+                dists, rows = np.atleast_1d(dists), np.atleast_1d(rows)
+                keep = mask[rows]
+                if keep.sum() >= k or k_tree == self._n_tree:
+                    break
+                k_tree = min(4 * k_tree, self._n_tree)
+            rows, dists = rows[keep], dists[keep]
+            buffer_rows = self._n_tree + np.flatnonzero(mask[self._n_tree:])
+            rows = np.concatenate([rows, buffer_rows])
+            dists = np.concatenate([dists, self._brute_force(q, buffer_rows)])
+
+        order = np.argsort(dists, kind="stable")[:k]
+        return [(self.keys[r], float(dists[i])) for i, r in zip(order, rows[order])]
+
+    def radius(self, query=None, r: float = 1.0, key: str = None, kind: str = None, league: str = None,
+               season: str = None) -> list[tuple[str, float]]:
+        """
+        All entries within Aitchison distance r, nearest first, with the same filters as `knn`
+        """
+        q = self._query_clr(query, key)
+        mask = self._mask(kind, league, season, key)
+
+        rows = np.asarray(self._tree.query_ball_point(q, r), dtype=np.int64) if self._tree is not None else np.empty(0, np.int64)
+        rows = np.concatenate([rows, np.arange(self._n_tree, len(self.keys))])
+        rows = rows[mask[rows]]
+        dists = self._brute_force(q, rows)
+        inside = dists <= r
+        rows, dists = rows[inside], dists[inside]
+        order = np.argsort(dists, kind="stable")
+        return [(self.keys[row], float(dists[i])) for i, row in zip(order, rows[order])]
@@ -1,6 +1,7 @@
 import socceraction
 import socceraction.spadl.wyscout as wyscout 
 import socceraction.atomic.spadl as atomicspadl
+from .profiling import profiled
 
 class EventToAtomic:
     def __init__(self, game_id: int, home_id: int, team_name_mapping: dict[int, str], player_name_mapping: dict[int, str], atomic_type_mapping: dict[int, str], wsl):
@@ -40,6 +41,7 @@ class EventToAtomic:
         return f'{minute}m{second}s'
     
 
+    @profiled("conversion", items_out=len)
     def complete_atomic_events(self):
         """
         Expand Atomic SPADL actions with start/end coordinates, readable type/team/player,
@@ -0,0 +1,195 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+LEAGUE_TEAMS = {
+    "Serie A": {"Lazio", "Internazionale", "Roma", "Sassuolo", "Cagliari", "Atalanta", "Chievo", "Benevento", "Bologna", "Udinese", "Crotone", "Napoli", "Milan", "Fiorentina", "Sampdoria", "SPAL", "Torino", "Genoa", "Juventus", "Hellas Verona"},
+    "Premier League": {"Burnley", "AFC Bournemouth", "Crystal Palace", "West Bromwich Albion", "Arsenal", "Huddersfield Town", "Brighton & Hove Albion", "Liverpool", "Watford", "Manchester United", "Newcastle United", "Chelsea", "Manchester City", "Southampton", "Swansea City", "Stoke City", "Leicester City", "Tottenham Hotspur", "Everton", "West Ham United"},
+    "La Liga": {"Barcelona", "Real Sociedad", "Atlético Madrid", "Eibar", "Espanyol", "Athletic Club", "Valencia", "Deportivo La Coruña", "Real Madrid", "Villarreal", "Deportivo Alavés", "Sevilla", "Getafe", "Málaga", "Las Palmas", "Girona", "Real Betis", "Leganés", "Celta de Vigo", "Levante"},
+    "Ligue 1": {"Caen", "PSG", "Dijon", "Angers", "Olympique Lyonnais", "Nice", "Olympique Marseille", "Amiens SC", "Bordeaux", "Metz", "Strasbourg", "Nantes", "Montpellier", "Rennes", "Saint-Étienne", "Lille", "Toulouse", "Guingamp", "Troyes", "Monaco"},
+    "Bundesliga": {"Bayern München", "Stuttgart", "Hoffenheim", "Borussia Dortmund", "Hertha BSC", "RB Leipzig", "Freiburg", "Augsburg", "Schalke 04", "Eintracht Frankfurt", "Hannover 96", "Bayer Leverkusen", "Borussia M'gladbach", "Hamburger SV", "Werder Bremen", "Mainz 05", "Wolfsburg", "Köln"},
+}
+
+TEAM_LEAGUE = {team: league for league, teams in LEAGUE_TEAMS.items() for team in teams}
+
+
+def team_league(team: str) -> str:
+    """
+    Returns the league of a club in the 2017/18 Wyscout data, or "" if unknown
+    """
+    return TEAM_LEAGUE.get(team, "")
+
+
+def clr_rows(X: np.ndarray) -> np.ndarray:
+    """
+    Row-wise centered log-ratio transform of a matrix of compositions
+    """
+    logX = np.log(np.asarray(X, dtype=float))
+    return logX - logX.mean(axis=1, keepdims=True)
+
+
+def clr_inverse(clr_mean: np.ndarray) -> np.ndarray:
+    """
+    Maps (a stack of) mean CLR vectors back to compositions, as in `aitchison_mean`
+    """
+    mu = np.exp(clr_mean)
+    return mu / mu.sum(axis=-1, keepdims=True)
+
+
+def topic_distributions_from_model(lda_model, corpus, keys) -> dict[str, np.ndarray]:
+    """
+    Full (unfiltered) topic distribution of every document, as get_document_topics computes them
+    before dropping tiny topics; keys are the "gameid_team" names of the corpus documents in order
+    """
+    gamma, _ = lda_model.inference(corpus)
+    theta = gamma / gamma.sum(axis=1, keepdims=True)
+    return dict(zip(keys, theta))
+
+
+def load_derived(data_dir, names=("movement_chain_clusters", "lda_model", "corpus_train", "df_matches")) -> dict:
+    """
+    Unpickles the derived notebook outputs `data_dir/<name>.pkl`
+    """
+    data_dir = Path(data_dir)
+    derived = {}
+    for name in names:
+        with open(data_dir / f"{name}.pkl", "rb") as f:
+            derived[name] = pickle.load(f)
+    return derived
+
+
+def load_topic_distributions(data_dir) -> tuple[pd.DataFrame, dict[str, np.ndarray]]:
+    """
+    Loads `df_matches` and the per-match topic distributions from the derived pickles of notebooks 01-04
+    """
+    derived = load_derived(data_dir)
+    topic_distributions_data = topic_distributions_from_model(derived["lda_model"], derived["corpus_train"],
+                                                              derived["movement_chain_clusters"])
+    return derived["df_matches"], topic_distributions_data
+
+
+class TopicStore:
+    """
+    Column store of per-match topic distributions, indexed for team, venue, date and league queries
+
+    Rows are sorted by team and then by date, so each team is one contiguous block
+    and date splits are binary searches inside that block
+    """
+
+    def __init__(self, topics: np.ndarray, game_ids: np.ndarray, teams: np.ndarray, venues: np.ndarray,
+                 dates: np.ndarray, leagues: np.ndarray):
+        order = np.lexsort((dates, teams))
+        self.topics = np.asarray(topics, dtype=float)[order]
+        self.game_ids = game_ids[order]
+        self.teams = teams[order]
+        self.venues = venues[order]
+        self.dates = dates[order]
+        self.leagues = leagues[order]
+
+        # CLR coordinates, so Aitchison means over any subset are plain means
+        self.clr = clr_rows(self.topics)
+        # Prefix sums of the CLR rows: the Aitchison mean of rows [a, b) is one difference away
+        self.clr_prefix = np.vstack([np.zeros((1, self.clr.shape[1])), np.cumsum(self.clr, axis=0)])
+
+        team_names, starts, sizes = np.unique(self.teams, return_index=True, return_counts=True)
+        self.team_blocks = {team: (int(start), int(start + size)) for team, start, size in zip(team_names, starts, sizes)}
+        self.team_leagues = {team: self.leagues[start] for team, (start, _) in self.team_blocks.items()}
+
+    @classmethod
+    def from_distributions(cls, df_matches: pd.DataFrame, topic_distributions_data: dict[str, list[float]],
+                           league_of=team_league) -> "TopicStore":
+        """
+        Builds the store from the notebooks' `df_matches` and `{"gameid_team": topic vector}` dict
+        """
+        n = len(topic_distributions_data)
+        game_ids = np.empty(n, dtype=np.int64)
+        teams = np.empty(n, dtype=object)
+        for i, key in enumerate(topic_distributions_data):
+            match_id, team = key.split("_", 1)
+            game_ids[i] = int(match_id)
+            teams[i] = team
+        topics = np.asarray(list(topic_distributions_data.values()), dtype=float)
+
+        matches = df_matches.drop_duplicates("game_id").set_index("game_id")
+        matches = matches.reindex(game_ids)
+        home = matches["home_team_name"].to_numpy(dtype=object)
+        away = matches["away_team_name"].to_numpy(dtype=object)
+        venues = np.where(home == teams, "home", np.where(away == teams, "away", ""))
+        dates = pd.to_datetime(matches["game_date"]).to_numpy(dtype="datetime64[ns]")
+        leagues = np.array([league_of(team) for team in teams], dtype=object)
+
+        return cls(topics, game_ids, teams.astype(str), venues, dates, leagues.astype(str))
+
+    def team_rows(self, team: str) -> slice:
+        start, stop = self.team_blocks.get(team, (0, 0))
+        return slice(start, stop)
+
+    def date_rows(self, team: str, date) -> tuple[slice, slice]:
+        """
+        Rows of a team's matches strictly before and strictly after the given date
+        """
+        start, stop = self.team_blocks.get(team, (0, 0))
+        date = np.datetime64(pd.Timestamp(date), "ns")
+        block = self.dates[start:stop]
+        # NaT sorts last, so only search within the dated part of the block
+        dated = start + int(np.count_nonzero(~np.isnat(block)))
+        block = self.dates[start:dated]
+        pre = start + int(np.searchsorted(block, date, side="left"))
+        post = start + int(np.searchsorted(block, date, side="right"))
+        return slice(start, pre), slice(post, dated)
+
+    def league_teams(self, league: str) -> list[str]:
+        return [team for team, team_league_name in self.team_leagues.items() if team_league_name == league]
+
+    def style(self, rows) -> np.ndarray:
+        """
+        Aitchison mean of the topic distributions in the given rows
+        """
+        return clr_inverse(self.clr[rows].mean(axis=0))
+
+    def window_styles(self, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        """
+        Aitchison means of the row windows [starts[i], stops[i]) in O(topics) each; empty windows give NaN
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        stops = np.asarray(stops, dtype=np.int64)
+        sizes = stops - starts
+        styles = np.full((len(sizes), self.clr.shape[1]), np.nan)
+        filled = sizes > 0
+        mean_clr = (self.clr_prefix[stops[filled]] - self.clr_prefix[starts[filled]]) / sizes[filled, None]
+        styles[filled] = clr_inverse(mean_clr)
+        return styles
+
+    def club_styles(self, teams=None) -> dict[str, np.ndarray]:
+        if teams is None:
+            teams = self.team_blocks
+        return {team: self.style(self.team_rows(team)) for team in teams}
+
+    def home_vs_away(self, team: str) -> dict[str, np.ndarray]:
+        """
+        Indexed counterpart of `home_vs_away`
+        """
+        rows = self.team_rows(team)
+        venues = self.venues[rows]
+        clr = self.clr[rows]
+        return {"home style": clr_inverse(clr[venues == "home"].mean(axis=0)),
+                "away style": clr_inverse(clr[venues == "away"].mean(axis=0))}
+
+    def split_matches(self, team: str, date) -> dict[str, np.ndarray]:
+        """
+        Indexed counterpart of `split_matches`
+        """
+        pre, post = self.date_rows(team, date)
+        return {f"pre {date}": self.style(pre), f"post {date}": self.style(post)}
+
+    def home_vs_away_all(self, teams=None) -> dict[str, dict[str, np.ndarray]]:
+        if teams is None:
+            teams = self.team_blocks
+        return {team: self.home_vs_away(team) for team in teams}
+
+    def split_matches_all(self, date, teams=None) -> dict[str, dict[str, np.ndarray]]:
+        if teams is None:
+            teams = self.team_blocks
+        return {team: self.split_matches(team, date) for team in teams}
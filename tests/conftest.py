@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+@pytest.fixture
+def make_data():
+    """
+    Factory of synthetic (df_matches, topic_distributions_data): random fixtures between the teams and a
+    random 6-topic distribution per club and match; dates are random within 200 days unless days_apart is given
+    """
+    def make(seed=0, n_games=40, teams=("Milan", "Roma", "Lazio", "Napoli"), days_apart=None):
+        rng = np.random.default_rng(seed)
+        rows, topics = [], {}
+        for g in range(n_games):
+            home, away = rng.choice(list(teams), size=2, replace=False)
+            days = days_apart * g if days_apart else int(rng.integers(0, 200))
+            date = pd.Timestamp("2017-08-01") + pd.Timedelta(days=days)
+            rows.append({"game_id": 100 + g, "home_team_name": home, "away_team_name": away, "game_date": date})
+            for team in (home, away):
+                topics[f"{100 + g}_{team}"] = rng.dirichlet(np.ones(6)).tolist()
+        return pd.DataFrame(rows), topics
+
+    return make
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.applications_utils import style_metrics, standardized
+from playstyle_utils.compositional import aitchison_mean, total_variation_distance
+from playstyle_utils.topic_store import TopicStore
+
+TEAMS = ["Milan", "Roma", "Lazio", "Napoli", "Arsenal", "Chelsea", "Everton"]
+
+def test_style_metrics_match_notebook_loops(make_data):
+    df_matches, topics = make_data(n_games=60, teams=TEAMS)
+    store = TopicStore.from_distributions(df_matches, topics)
+    metrics = style_metrics(store, "Serie A").set_index("Club")
+
+    clubs = store.league_teams("Serie A")
+    groups = {club: [np.array(v) for k, v in topics.items() if k.split("_")[1] == club] for club in clubs}
+    styles = {club: aitchison_mean(vecs) for club, vecs in groups.items()}
+
+    uniqueness, consistency = [], []
+    for club in clubs:
+        others = aitchison_mean([styles[c] for c in clubs if c != club])
+        uniqueness.append([club, total_variation_distance(styles[club], others)])
+        vecs = groups[club]
+        dists = [total_variation_distance(a, b) for i, a in enumerate(vecs) for b in vecs[i + 1:]]
+        consistency.append([club, 1 / (1 + np.mean(dists))])
+
+    assert np.allclose(metrics.loc[clubs, "Uniqueness"], [u for _, u in uniqueness])
+    assert np.allclose(metrics.loc[clubs, "Consistency"], [c for _, c in consistency])
+    assert np.allclose(metrics.loc[clubs, "Uniqueness_z"], [z for _, z in standardized(uniqueness, clubs)])
+
+def test_style_metrics_all_leagues(make_data):
+    df_matches, topics = make_data(n_games=60, teams=TEAMS)
+    metrics = style_metrics(TopicStore.from_distributions(df_matches, topics))
+    assert set(metrics["League"]) == {"Serie A", "Premier League"}
+    assert len(metrics) == 7
+
+def test_style_metrics_small_leagues(make_data):
+    df_matches, topics = make_data(n_games=60, teams=TEAMS)
+    store = TopicStore.from_distributions(df_matches, topics)
+    metrics = style_metrics(store, "Ligue 1")
+    assert metrics.empty
+    assert "Uniqueness_z" in metrics.columns
+
+    one_club = {key: vec for key, vec in topics.items() if key.split("_")[1] in ("Milan", "Arsenal", "Chelsea")}
+    store = TopicStore.from_distributions(df_matches, one_club)
+    with pytest.raises(ValueError, match="at least 2 clubs"):
+        style_metrics(store, "Serie A")
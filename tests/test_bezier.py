@@ -0,0 +1,24 @@
+import numpy as np
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.bezier_utils import Bezier, bezier_curves
+
+def test_curve_matches_de_casteljau():
+    rng = np.random.default_rng(0)
+    points = rng.random((6, 2))
+    t_points = np.arange(0, 1, 0.01)
+    expected = np.array([Bezier.Point(t, list(points)) for t in t_points])
+    assert np.allclose(Bezier.Curve(t_points, points), expected, atol=1e-12)
+
+def test_bezier_curves_mixed_degrees():
+    rng = np.random.default_rng(1)
+    polygons = [rng.random((n, 2)) for n in (2, 5, 8, 5)]
+    t_points = np.linspace(0, 1, 50)
+    curves = bezier_curves(polygons, t_points)
+    assert curves.shape == (4, 50, 2)
+    for polygon, curve in zip(polygons, curves):
+        assert np.allclose(curve[0], polygon[0]) and np.allclose(curve[-1], polygon[-1])
+        expected = np.array([Bezier.Point(t, list(polygon)) for t in t_points])
+        assert np.allclose(curve, expected, atol=1e-12)
@@ -0,0 +1,27 @@
+import numpy as np
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.bootstrap import bootstrap_clr_means, bootstrap_club_styles, bootstrap_home_vs_away
+from playstyle_utils.topic_store import TopicStore
+
+def test_bootstrap_means_shapes_and_determinism():
+    clr = np.arange(12, dtype=float).reshape(6, 2)
+    groups = [np.array([0]), np.array([1, 2, 3]), np.array([], dtype=int)]
+    means = bootstrap_clr_means(clr, groups, n_boot=50, seed=1, chunk=16)
+    assert means.shape == (3, 50, 2)
+    assert np.allclose(means[0], clr[0])
+    assert np.all((means[1] >= clr[1]) & (means[1] <= clr[3]))
+    assert np.isnan(means[2]).all()
+    assert np.array_equal(means[:2], bootstrap_clr_means(clr, groups, n_boot=50, seed=1, chunk=16, n_jobs=3)[:2])
+
+def test_club_intervals_contain_estimate(make_data):
+    store = TopicStore.from_distributions(*make_data(n_games=60, days_apart=3))
+    styles = bootstrap_club_styles(store, n_boot=300, seed=0)
+    assert len(styles) == 4 * 6
+    assert ((styles["lower"] <= styles["style"]) & (styles["style"] <= styles["upper"])).all()
+
+    home_away = bootstrap_home_vs_away(store, n_boot=300, seed=0)
+    assert np.allclose(home_away["difference"], home_away["home"] - home_away["away"])
+    assert (home_away["lower"] <= home_away["upper"]).all()
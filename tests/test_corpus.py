@@ -0,0 +1,38 @@
+import numpy as np
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.clustering import split, compute_stability_metric
+from playstyle_utils.corpus import build_document_term_matrix, compute_stability_metric_from_matrix
+
+def make_clusters(seed=0, n_games=12, n_teams=6):
+    rng = np.random.default_rng(seed)
+    clusters = {}
+    for g in range(n_games):
+        for t in rng.choice(n_teams, size=2, replace=False):
+            clusters[f"{1000 + g}_Team{t}"] = rng.choice([3, 17, 42, 8, 99], size=rng.integers(1, 30)).tolist()
+    return clusters
+
+def test_counts_and_keys():
+    clusters = {"1_A": [5, 3, 5], "2_B": [3, 7]}
+    dtm = build_document_term_matrix(clusters)
+    assert dtm.vocabulary.tolist() == [3, 5, 7]
+    assert dtm.counts.toarray().tolist() == [[1, 2, 0], [1, 0, 1]]
+    assert dtm.keys == ["1_A", "2_B"]
+    assert dtm.row(2, "B") == 1
+
+def test_gensim_corpus_matches_doc2bow():
+    from gensim import corpora
+    clusters = make_clusters()
+    docs = [[str(token) for token in doc] for doc in clusters.values()]
+    dictionary = corpora.Dictionary(docs)
+    corpus = build_document_term_matrix(clusters).to_gensim_corpus(dictionary)
+    for bow, doc in zip(corpus, docs):
+        assert sorted((int(i), int(c)) for i, c in bow) == dictionary.doc2bow(doc)
+
+def test_stability_matches_counter_version():
+    clusters = make_clusters(seed=3)
+    dtm = build_document_term_matrix(clusters)
+    for seed in range(3):
+        assert compute_stability_metric_from_matrix(dtm, seed=seed) == compute_stability_metric(split(clusters, seed=seed))
@@ -0,0 +1,54 @@
+import numpy as np
+import kmedoids
+import pytest
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.clustering import assign_to_nearest_medoids, weighted_kmedoids
+from playstyle_utils.dedup import deduplicate_trajectories, expand_distance_matrix
+from playstyle_utils.dtw import compute_dtw_distance_matrix
+
+def make_trajectories(seed=0, n_base=60, n=200):
+    rng = np.random.default_rng(seed)
+    # Coordinates on a coarse grid, like discrete event locations
+    base = [np.round(rng.random((rng.integers(2, 6), 2)) * [10, 6]) / [10, 6] for _ in range(n_base)]
+    return [base[i].copy() for i in rng.integers(0, n_base, n)]
+
+def test_deduplicate_round_trip():
+    trajs = make_trajectories()
+    unique, counts, inverse = deduplicate_trajectories(trajs)
+    assert len(unique) < len(trajs) and counts.sum() == len(trajs)
+    assert all(np.array_equal(unique[inverse[i]], traj) for i, traj in enumerate(trajs))
+
+    near = [np.array([[0.1, 0.2], [0.5, 0.5]]), np.array([[0.1000001, 0.2], [0.5, 0.5]])]
+    assert len(deduplicate_trajectories(near)[0]) == 2
+    assert len(deduplicate_trajectories(near, decimals=4)[0]) == 1
+
+def test_deduplicated_assignment_matches():
+    trajs = make_trajectories(seed=1)
+    chains = {"1_Milan": trajs[:120], "2_Roma": trajs[120:]}
+    medoid_trajs = trajs[:5]
+    assert assign_to_nearest_medoids([10, 11, 12, 13, 14], medoid_trajs, chains, deduplicate=True) == \
+        assign_to_nearest_medoids([10, 11, 12, 13, 14], medoid_trajs, chains)
+
+    # Near-copies share the label of the first occurrence once rounded together
+    shifted = {"1_Milan": [traj + 1e-7 for traj in trajs[:120]], "2_Roma": trajs[120:]}
+    rounded = assign_to_nearest_medoids([10, 11, 12, 13, 14], medoid_trajs, shifted, deduplicate=True, decimals=4)
+    assert rounded == assign_to_nearest_medoids([10, 11, 12, 13, 14], medoid_trajs, chains)
+
+def test_weighted_kmedoids_matches_fastpam_on_copies():
+    trajs = make_trajectories(seed=2)
+    unique, counts, inverse = deduplicate_trajectories(trajs)
+    distances = compute_dtw_distance_matrix(unique)
+    expanded = expand_distance_matrix(distances, inverse)
+    assert np.array_equal(expanded, compute_dtw_distance_matrix(trajs))
+
+    weighted = weighted_kmedoids(distances, counts, 6)
+    with pytest.raises(ValueError):
+        weighted_kmedoids(distances, counts, len(distances) + 1)
+    reference = kmedoids.fastpam1(expanded, 6, init="build")
+    assert np.isclose(weighted.loss, reference.loss)
+    assert sorted(inverse[reference.medoids]) == sorted(weighted.medoids)
+    labels = weighted.labels[inverse]
+    assert np.allclose(distances[inverse, weighted.medoids[labels]], distances[:, weighted.medoids][inverse].min(axis=1))
@@ -14,3 +14,17 @@ def test_dtw_symmetry():
     b = np.array([[0.0, 0.0], [2.0, 0.0]])
     assert dtw_distance_numba(a, b) == dtw_distance_numba(b, a)
 
+
+def test_compact_condensed_matrix_within_bound():
+    from playstyle_utils.dtw import compute_dtw_distance_matrix, condensed_to_square, condensed_row, condensed_index
+    rng = np.random.default_rng(0)
+    trajs = [rng.random((rng.integers(5, 9), 2)) for _ in range(30)]
+    full = compute_dtw_distance_matrix(trajs)
+    compact = compute_dtw_distance_matrix(trajs, dtype=np.float32, condensed=True)
+    assert compact.dtype == np.float32 and compact.shape == (30 * 29 // 2,)
+
+    square = condensed_to_square(compact)
+    assert square.dtype == np.float32
+    assert np.abs(square - full).max() < 4e-6
+    assert np.allclose(condensed_row(compact, 30, 7), square[7])
+    assert compact[condensed_index(30, 12, 3)] == square[3, 12]
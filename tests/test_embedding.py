@@ -0,0 +1,56 @@
+import numpy as np
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.clustering import assign_to_nearest_medoids
+from playstyle_utils.embedding import (embed_trajectories, embedding_distances, embedding_distance_matrix,
+                                      assign_to_nearest_medoids_approx, label_agreement)
+
+def test_arc_length_resampling():
+    traj = [[0.0, 0.0], [0.1, 0.0], [1.0, 0.0]]
+    emb = embed_trajectories([traj], n_points=11).reshape(11, 2)
+    assert np.allclose(emb[:, 0], np.linspace(0, 1, 11), atol=1e-6)
+    assert np.allclose(emb[:, 1], 0)
+
+def make_clustered(seed=0, noise=8.0):
+    rng = np.random.default_rng(seed)
+    medoids = [rng.random((rng.integers(5, 9), 2)) * [105, 68] for _ in range(8)]
+    def near(m):
+        points = medoids[m] + rng.normal(0, noise, medoids[m].shape)
+        # Half the copies miss a point, so lengths differ from their medoid
+        return (np.delete(points, rng.integers(len(points)), axis=0) if rng.random() < 0.5 else points).tolist()
+    chains = {f"{g}_Team": [near(m) for m in rng.integers(0, 8, 40)] for g in range(5)}
+    return medoids, chains
+
+def test_approximate_assignment_on_clustered_data():
+    medoids, chains = make_clustered()
+    medoid_indices = list(range(100, 108))
+    exact = assign_to_nearest_medoids(medoid_indices, medoids, chains)
+
+    approx = assign_to_nearest_medoids_approx(medoid_indices, medoids, chains)
+    assert label_agreement(approx, exact) >= 0.85
+
+    # 3 of 8 candidates: exact wherever the true medoid is among the 3 nearest in embedding space
+    refined = assign_to_nearest_medoids_approx(medoid_indices, medoids, chains, refine=3)
+    assert label_agreement(refined, exact) > label_agreement(approx, exact)
+    trajs = [traj for trajs in chains.values() for traj in trajs]
+    distances = embedding_distances(embed_trajectories(trajs), embed_trajectories(medoids))
+    candidates = np.argsort(distances, axis=1, kind="stable")[:, :3] + 100
+    exact_labels = [label for labels in exact.values() for label in labels]
+    refined_labels = [label for labels in refined.values() for label in labels]
+    covered = [t for t, label in enumerate(exact_labels) if label in candidates[t]]
+    assert len(covered) < len(trajs)
+    assert all(refined_labels[t] == exact_labels[t] for t in covered)
+
+    assert label_agreement(assign_to_nearest_medoids_approx(medoid_indices, medoids, chains, refine=8), exact) == 1.0
+
+def test_embedding_distance_matrix_in_chunks():
+    _, chains = make_clustered(seed=1)
+    trajs = chains["0_Team"]
+    distances = embedding_distance_matrix(trajs, chunk=7)
+    assert distances.dtype == np.float32 and np.all(np.diag(distances) == 0)
+    embedding = embed_trajectories(trajs)
+    expected = embedding_distances(embedding, embedding)
+    np.fill_diagonal(expected, 0)
+    assert np.allclose(distances, expected, rtol=1e-5, atol=1e-3)
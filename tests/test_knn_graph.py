@@ -0,0 +1,28 @@
+import numpy as np
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.dtw import compute_dtw_distance_matrix, pack_trajectories
+from playstyle_utils.knn_graph import dtw_knn_graph
+
+def test_knn_graph_matches_dense_matrix():
+    rng = np.random.default_rng(0)
+    trajs = [rng.random((rng.integers(1, 9), 2)) for _ in range(150)]
+    trajs.append(trajs[3].copy())
+    dense = compute_dtw_distance_matrix(trajs)
+    graph = dtw_knn_graph(trajs, k=5, chunk=64)
+
+    assert graph.shape == (151, 151) and graph.nnz == 151 * 5
+    for i in range(151):
+        row = dense[i].copy()
+        row[i] = np.inf
+        expected = np.lexsort((np.arange(151), row))[:5]
+        start, stop = graph.indptr[i], graph.indptr[i + 1]
+        assert list(graph.indices[start:stop]) == list(expected)
+        assert np.array_equal(graph.data[start:stop], row[expected])
+
+def test_pack_trajectories():
+    coords, offsets = pack_trajectories([[[0, 0], [1, 1]], [[2, 2]]])
+    assert offsets.tolist() == [0, 2, 3]
+    assert coords[offsets[1]:offsets[2]].tolist() == [[2.0, 2.0]]
@@ -0,0 +1,48 @@
+import copy
+import numpy as np
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.algorithm_utils import compute_club_topic_distributions
+from playstyle_utils.corpus import build_document_term_matrix
+from playstyle_utils.lda_scorer import LdaScorer, _digamma
+
+def make_model(seed=0, n_docs=80):
+    from gensim import corpora, models
+    rng = np.random.default_rng(seed)
+    clusters = {}
+    for g in range(n_docs // 2):
+        for team in rng.choice(["Milan", "Roma", "Lazio", "Napoli"], size=2, replace=False):
+            clusters[f"{100 + g}_{team}"] = rng.choice(30, size=rng.integers(5, 60), p=rng.dirichlet(np.ones(30) * 0.3)).tolist()
+    docs = {key: [str(token) for token in doc] for key, doc in clusters.items()}
+    dictionary = corpora.Dictionary(list(docs.values()))
+    corpus = [dictionary.doc2bow(doc) for doc in docs.values()]
+    lda_model = models.LdaModel(corpus=corpus, id2word=dictionary, num_topics=4, random_state=1, passes=5, alpha=1/4, eta=1/4)
+    return clusters, docs, dictionary, corpus, lda_model
+
+def test_digamma():
+    from scipy.special import digamma
+    for x in [1e-3, 0.25, 1.0, 1.4616, 5.9, 6.0, 37.5, 1e4]:
+        assert abs(_digamma(x) - digamma(x)) < 1e-10
+
+def test_scorer_matches_gensim_inference(tmp_path):
+    clusters, docs, dictionary, corpus, lda_model = make_model()
+    scorer = LdaScorer.from_model(lda_model)
+    counts = build_document_term_matrix(clusters).model_counts(dictionary)
+
+    # Same starting gamma as gensim draws
+    init = copy.deepcopy(lda_model.random_state).gamma(100., 1. / 100., (len(corpus), lda_model.num_topics))
+    gamma, _ = lda_model.inference(corpus)
+    assert np.abs(scorer.topic_distributions(counts, init) - gamma / gamma.sum(axis=1, keepdims=True)).max() < 1e-4
+
+    scorer.save(tmp_path / "scorer.npz")
+    loaded = LdaScorer.load(tmp_path / "scorer.npz")
+    assert np.array_equal(loaded.topic_distributions(counts), scorer.topic_distributions(counts))
+
+def test_club_topic_distributions_with_scorer():
+    _, docs, dictionary, _, lda_model = make_model(seed=1)
+    expected = compute_club_topic_distributions(docs, dictionary, lda_model, 4)
+    scored = compute_club_topic_distributions(docs, dictionary, lda_model, 4, scorer=LdaScorer.from_model(lda_model))
+    for club in expected:
+        assert np.abs(scored[club] - expected[club]).max() < 0.02
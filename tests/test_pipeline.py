@@ -0,0 +1,96 @@
+from functools import partial
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+import numpy as np
+import pytest
+from playstyle_utils.dtw import condensed_to_square
+from playstyle_utils.pipeline import ArtifactCache, Pipeline, code_hash, stage_modules
+
+calls = []
+
+def scale(values, factor=1):
+    calls.append("scale")
+    return [v * factor for v in values]
+
+def total(values):
+    calls.append("total")
+    return sum(values)
+
+def build(cache_dir, factor=2, data=(1, 2, 3)):
+    pipeline = Pipeline(ArtifactCache(cache_dir))
+    pipeline.source("data", list(data))
+    pipeline.add("scaled", scale, inputs=["data"], params={"factor": factor})
+    pipeline.add("total", total, inputs=["scaled"])
+    return pipeline
+
+def test_unchanged_stages_are_reused(tmp_path):
+    calls.clear()
+    assert build(tmp_path).run("total") == 12
+    assert calls == ["scale", "total"]
+
+    calls.clear()
+    pipeline = build(tmp_path)
+    assert pipeline.run("total") == 12
+    assert calls == []
+    # Upstream stages are not even loaded when the target is cached
+    assert pipeline.log == [("total", "cached")]
+
+def test_changed_parameter_reruns_downstream_only(tmp_path):
+    calls.clear()
+    build(tmp_path).run()
+    calls.clear()
+    assert build(tmp_path, factor=3).run("total") == 18
+    assert calls == ["scale", "total"]
+
+    calls.clear()
+    assert build(tmp_path, data=(1, 2, 4)).run("scaled") == [2, 4, 8]
+    assert calls == ["scale"]
+
+def test_array_parameter_is_hashed_by_content(tmp_path):
+    def shift(values, offsets):
+        calls.append("shift")
+        return [v + offsets.sum() for v in values]
+
+    def build_shifted(offsets):
+        pipeline = Pipeline(ArtifactCache(tmp_path))
+        pipeline.source("data", [1, 2, 3])
+        pipeline.add("shifted", shift, inputs=["data"], params={"offsets": offsets})
+        return pipeline
+
+    offsets = np.zeros(2000)
+    calls.clear()
+    build_shifted(offsets).run("shifted")
+    # numpy abbreviates the repr of this array to the same text as before the change
+    offsets[1000] = 1.0
+    assert build_shifted(offsets).run("shifted") == [2, 3, 4]
+    assert calls == ["shift", "shift"]
+
+def test_resourcing_reruns_downstream(tmp_path):
+    pipeline = Pipeline(ArtifactCache(tmp_path))
+    pipeline.source("data", [1, 2, 3])
+    pipeline.add("total", total, inputs=["data"])
+    assert pipeline.run("total") == 6
+    pipeline.source("data", [10, 20])
+    assert pipeline.run("total") == 30
+
+def test_code_hash_of_other_callables(tmp_path):
+    assert code_hash(partial(scale, factor=2)) != code_hash(partial(scale, factor=3))
+    with pytest.raises(TypeError, match="explicit version"):
+        code_hash(sum)
+
+    pipeline = Pipeline(ArtifactCache(tmp_path))
+    pipeline.source("data", [1, 2, 3])
+    pipeline.add("doubled", partial(scale, factor=2), inputs=["data"])
+    pipeline.add("total", sum, inputs=["doubled"], version="1")
+    assert pipeline.run("total") == 12
+
+def test_stage_hashes_only_the_modules_it_uses():
+    def square(condensed):
+        return condensed_to_square(condensed)
+
+    modules = stage_modules(square)
+    # dtw and what it imports from the package, but not unrelated modules such as the report renderer
+    assert {"playstyle_utils.dtw", "playstyle_utils.profiling"} <= set(modules)
+    assert "playstyle_utils.report" not in modules and "playstyle_utils.service" not in modules
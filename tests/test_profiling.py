@@ -0,0 +1,55 @@
+import json
+import pandas as pd
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.noise import RemoveNoise
+from playstyle_utils.phases import MakeMovementChains, SplitPossessionPhases
+from playstyle_utils.profiling import StageProfiler, profiled
+
+def test_profiler_records_stage_counts():
+    trajs = [[[10.0, 10.0], [50.0, 30.0], [105.0, 0.0]],
+             [[20.0, 30.0], [40.0, 35.0], [70.0, 30.0]]]
+    with StageProfiler() as profiler:
+        RemoveNoise(trajs).remove_noise()
+        MakeMovementChains([[{"player": p} for p in "ABCDE"]])
+
+    summary = {row["stage"]: row for row in profiler.summary()}
+    assert summary["noise_removal"]["items_in"] == 2
+    assert summary["noise_removal"]["items_out"] == 1
+    assert summary["noise_removal"]["items_dropped"] == 1
+    assert summary["chain_building"]["items_out"] == 2
+    # Sequences in, chains out: nothing is dropped in the same units
+    assert summary["chain_building"]["items_dropped"] is None
+    assert summary["noise_removal"]["peak_mb"] >= 0
+    assert profiler.bottleneck() in summary
+
+    assert {row["stage"] for row in json.loads(profiler.to_json())} == {"noise_removal", "chain_building"}
+    assert profiler.to_csv().splitlines()[0].startswith("stage,calls,seconds")
+
+def test_phase_split_counts_events():
+    types = ["pass", "pass", "pass", "pass", "out", "pass", "pass", "pass", "corner"]
+    actions = pd.DataFrame({"team_id": 1, "type": types, "nice_time": [f"0m{i + 1}s" for i in range(len(types))]})
+    with StageProfiler(trace_memory=False) as profiler:
+        phases = SplitPossessionPhases().split_possession_phases(actions, {1: "Milan"})
+
+    summary = profiler.summary()[0]
+    assert [len(phase) for phase in phases[1]] == [3, 4]
+    assert (summary["items_in"], summary["items_out"], summary["items_dropped"]) == (9, 7, 2)
+
+def test_uncounted_items_stay_empty():
+    @profiled("conversion", items_out=len)
+    def convert():
+        return [1, 2, 3]
+
+    with StageProfiler(trace_memory=False) as profiler:
+        convert()
+        convert()
+    summary = profiler.summary()[0]
+    assert (summary["items_in"], summary["items_out"], summary["items_dropped"]) == (None, 6, None)
+
+def test_no_profiler_no_records():
+    profiler = StageProfiler()
+    RemoveNoise([[[10.0, 10.0], [50.0, 30.0]]]).remove_noise()
+    assert profiler.records == []
@@ -0,0 +1,14 @@
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.report import render_club_charts
+from playstyle_utils.topic_store import TopicStore
+
+def test_render_club_charts_writes_files(tmp_path, make_data):
+    store = TopicStore.from_distributions(*make_data(n_games=20, teams=("Milan", "Roma", "Borussia Dortmund"), days_apart=7))
+    paths = render_club_charts(store, tmp_path, dates=["2017-11-01"], processes=2)
+    assert len(paths) == 6
+    assert all(Path(p).stat().st_size > 0 for p in paths)
+    assert (tmp_path / "Bundesliga" / "Borussia_Dortmund_home_away.png").exists()
+    assert (tmp_path / "Serie_A" / "Milan_2017-11-01.png").exists()
@@ -0,0 +1,69 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.service import StyleService, serve
+
+def get(server, path):
+    url = f"http://127.0.0.1:{server.server_port}/{path}"
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+def test_service_answers_over_http(make_data):
+    service = StyleService(*make_data())
+    server = serve(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        status, body = get(server, "club_style?team=Milan")
+        assert status == 200
+        assert np.allclose(body["style"], service.store.style(service.store.team_rows("Milan")))
+
+        status, body = get(server, "similar?team=Milan&k=2")
+        assert status == 200 and len(body["similar"]) == 2
+        assert "Milan" not in [entry["key"] for entry in body["similar"]]
+
+        status, body = get(server, "split?team=Roma&date=2017-11-01")
+        assert status == 200 and set(body) == {"team", "pre 2017-11-01", "post 2017-11-01"}
+
+        status, body = get(server, "metrics?league=Serie%20A")
+        assert status == 200 and {row["Club"] for row in body} == {"Milan", "Roma", "Lazio", "Napoli"}
+
+        # No matches before the date: the pre window's style is NaN, served as null
+        status, body = get(server, "split?team=Roma&date=1990-01-01")
+        assert status == 200 and all(value is None for value in body["pre 1990-01-01"])
+
+        assert get(server, "club_style?team=Nobody")[0] == 404
+        assert get(server, "split?team=Roma")[0] == 400
+        assert get(server, "topics")[0] == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_answers_are_cached(make_data):
+    service = StyleService(*make_data(seed=1))
+    first = service.answer("home_away", {"team": "Lazio"})
+    assert service.answer("home_away", {"team": "Lazio"}) is first
+    assert service._cached_answer.cache_info().hits == 1
+
+def test_unexpected_errors_are_json(make_data, monkeypatch):
+    service = StyleService(*make_data())
+    def fail(endpoint, params):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(service, "answer", fail)
+    server = serve(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert get(server, "clubs") == (500, {"error": "internal error: RuntimeError"})
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.clustering import assign_to_nearest_medoids
+from playstyle_utils.dtw import compute_dtw_distance_matrix
+from playstyle_utils.noise import RemoveNoise
+from playstyle_utils.shared_pool import SharedWorkerPool
+
+def make_trajectories(seed=0):
+    rng = np.random.default_rng(seed)
+    trajs = [np.round(rng.random((rng.integers(2, 8), 2)) * [105, 68], 1).tolist() for _ in range(120)]
+    return {"1_Milan": trajs[:50], "2_Roma": trajs[50:90], "3_Lazio": trajs[90:]}
+
+def test_pool_matches_serial_functions():
+    chains = make_trajectories()
+    flat = [traj for trajs in chains.values() for traj in trajs]
+    medoid_indices = [3, 17, 60, 99]
+    medoid_trajs = [flat[i] for i in medoid_indices]
+
+    with SharedWorkerPool(chains, processes=2, chunk=16) as pool:
+        assert assign_to_nearest_medoids(medoid_indices, medoid_trajs, chains, pool=pool) == \
+            assign_to_nearest_medoids(medoid_indices, medoid_trajs, chains)
+        assert RemoveNoise(flat).find_noise_indices(pool) == RemoveNoise(flat).find_noise_indices()
+        arrays = [np.array(traj) for traj in flat]
+        assert np.array_equal(compute_dtw_distance_matrix(arrays, pool=pool), compute_dtw_distance_matrix(arrays))
+        assert np.array_equal(compute_dtw_distance_matrix(arrays, condensed=True, pool=pool),
+                              compute_dtw_distance_matrix(arrays, condensed=True))
+        condensed32 = compute_dtw_distance_matrix(arrays, dtype=np.float32, condensed=True, pool=pool)
+        assert condensed32.dtype == np.float32
+        assert np.allclose(condensed32, compute_dtw_distance_matrix(arrays, condensed=True), rtol=1e-6)
+        # Options the pool cannot honour are rejected instead of ignored
+        with pytest.raises(ValueError):
+            assign_to_nearest_medoids(medoid_indices, medoid_trajs, chains, dtype=np.float32, pool=pool)
+        with pytest.raises(ValueError):
+            assign_to_nearest_medoids(medoid_indices, medoid_trajs, chains, pool=pool, deduplicate=True)
+        name = pool.shared.handle["coords"][0]
+
+        # Workers keep the pool's trajectories mapped, but no block of a finished call
+        workers = [Path(f"/proc/{process.pid}/maps") for process in pool._pool._pool]
+        if all(maps.exists() for maps in workers):
+            for maps in workers:
+                assert "(deleted)" not in maps.read_text()
+
+    # Teardown unlinks the shared blocks
+    try:
+        from multiprocessing import shared_memory
+        shared_memory.SharedMemory(name=name)
+        assert False, "shared block still exists"
+    except FileNotFoundError:
+        pass
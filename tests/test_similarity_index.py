@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.algorithm_utils import aitchison_distance
+from playstyle_utils.similarity_index import StyleIndex, season_of
+
+def brute_force_knn(keys, vectors, query, k):
+    dists = [aitchison_distance(v, query) for v in vectors]
+    order = np.argsort(dists)[:k]
+    return [keys[i] for i in order]
+
+def test_knn_matches_brute_force_with_inserts():
+    rng = np.random.default_rng(0)
+    vectors = rng.dirichlet(np.ones(6), size=3000)
+    keys = [f"{i}_Team{i % 7}" for i in range(3000)]
+    index = StyleIndex(6, rebuild_threshold=400, brute_force_below=0)
+    index.add(keys[:2000], vectors[:2000], leagues=["A" if i % 2 else "B" for i in range(2000)])
+    index.rebuild()
+    # Inserts after the tree is built land in the buffer first
+    index.add(keys[2000:], vectors[2000:], leagues=["A" if i % 2 else "B" for i in range(2000, 3000)])
+
+    query = rng.dirichlet(np.ones(6))
+    assert [key for key, _ in index.knn(query, k=10)] == brute_force_knn(keys, vectors, query, 10)
+
+    league_a = [i for i in range(3000) if i % 2]
+    result = index.knn(query, k=5, league="A")
+    assert [key for key, _ in result] == brute_force_knn([keys[i] for i in league_a], vectors[league_a], query, 5)
+
+    radius = result[-1][1]
+    assert [key for key, _ in index.radius(query, radius, league="A")] == [key for key, _ in result]
+
+def test_query_by_key_excludes_itself():
+    index = StyleIndex(3)
+    index.add(["a", "b", "c"], [[0.2, 0.3, 0.5], [0.2, 0.35, 0.45], [0.6, 0.2, 0.2]], kind="club")
+    assert [key for key, _ in index.knn(key="a", k=1)] == ["b"]
+    with pytest.raises(ValueError):
+        index.knn(key="a", k=-1)
+    assert season_of("2018-03-01") == "2017/18"
+
+def test_adding_an_existing_key_replaces_it():
+    index = StyleIndex(3, rebuild_threshold=10, brute_force_below=0)
+    index.add(["a", "b", "c"], [[0.2, 0.3, 0.5], [0.2, 0.35, 0.45], [0.6, 0.2, 0.2]])
+    index.rebuild()
+    index.add(["a"], [[0.55, 0.25, 0.2]])
+    assert len(index) == 3
+    query = [0.3, 0.3, 0.4]
+    assert sorted(key for key, _ in index.knn(query, k=3)) == ["a", "b", "c"]
+    assert [key for key, _ in index.knn(key="c", k=2)][0] == "a"
+    assert [key for key, _ in index.knn(key="b", k=5)].count("a") == 1
+    assert [key for key, _ in index.radius(query, 10.0)].count("a") == 1
+
+    # Rebuilding drops the replaced row
+    before = index.knn(query, k=3)
+    index.rebuild()
+    assert len(index.keys) == 3 and index.knn(query, k=3) == before
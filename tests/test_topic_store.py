@@ -0,0 +1,48 @@
+import numpy as np
+from pathlib import Path
+import sys
+ROOT = Path.cwd().parent 
+sys.path.insert(0, str(ROOT))
+from playstyle_utils.applications_utils import home_vs_away, split_matches
+from playstyle_utils.topic_store import TopicStore, team_league
+
+def test_home_vs_away_matches_scan(make_data):
+    df_matches, topics = make_data()
+    store = TopicStore.from_distributions(df_matches, topics)
+    for team in ["Milan", "Roma", "Lazio", "Napoli"]:
+        expected = home_vs_away(team, df_matches, topics)
+        out = store.home_vs_away(team)
+        for key in expected:
+            assert np.allclose(out[key], expected[key])
+
+def test_split_matches_matches_scan(make_data):
+    df_matches, topics = make_data(seed=1)
+    store = TopicStore.from_distributions(df_matches, topics)
+    date = df_matches["game_date"].iloc[5].strftime("%Y-%m-%d")
+    for team, out in store.split_matches_all(date).items():
+        expected = split_matches(team, date, df_matches, topics)
+        for key in expected:
+            assert np.allclose(out[key], expected[key])
+
+def test_league_index(make_data):
+    df_matches, topics = make_data()
+    store = TopicStore.from_distributions(df_matches, topics)
+    assert team_league("Milan") == "Serie A"
+    assert sorted(store.league_teams("Serie A")) == ["Lazio", "Milan", "Napoli", "Roma"]
+
+def test_team_style_series_matches_direct_means(make_data):
+    from playstyle_utils.applications_utils import team_style_series
+    from playstyle_utils.compositional import aitchison_mean
+    df_matches, topics = make_data(seed=2)
+    store = TopicStore.from_distributions(df_matches, topics)
+    cutoffs = ["2017-10-01", "2017-12-01", "2018-02-01"]
+    series = team_style_series(store, cutoffs=cutoffs, teams=["Roma"])
+    for cutoff, (_, row) in zip(cutoffs, series.iterrows()):
+        expected = split_matches("Roma", cutoff, df_matches, topics)[f"pre {cutoff}"]
+        assert np.allclose(row.filter(like="topic_").to_numpy(dtype=float), expected)
+
+    rolling = team_style_series(store, window=3, teams=["Milan"])
+    rows = store.team_rows("Milan")
+    vecs = store.topics[rows]
+    for i in range(2, len(vecs)):
+        assert np.allclose(rolling.filter(like="topic_").iloc[i].to_numpy(dtype=float), aitchison_mean(vecs[i - 2:i + 1]))